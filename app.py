@@ -7,9 +7,11 @@ from flask import (
     url_for,
     make_response,
 )
+import threading
 import urllib.parse
+import click
 from bson import ObjectId
-from db import get_db
+from db import get_db, get_pool_stats
 from config import get_config
 from utils.auth import (
     token_required,
@@ -17,33 +19,109 @@ from utils.auth import (
     handle_logout,
     update_user_profile,
     delete_user_account,
-    get_user_profile
+    get_user_profile,
+    get_socket_user_id,
+    monitoring_required,
+    token_cache,
+    refresh_flight
 )
 from utils.study import (
     apply_to_study,
     get_study_participants,
     update_confirmed_candidates,
     get_studies_by_tab,
-    get_study_by_id,
+    get_study_with_participants,
     withdraw_from_study,
-    delete_study
+    delete_study,
+    study_list_cache,
+    study_fragment_cache,
+    study_fragment_etag,
+    get_viewer_role,
+    get_application_status,
+    get_date_recommendations,
+    backfill_candidate_counts,
+    rebuild_user_study_index,
+    check_user_study_index,
+    backfill_study_counters,
+    get_study_facets
 )
 from utils.notification import (
     get_user_notifications,
     get_unread_notification_count,
     mark_notification_as_read,
-    mark_all_notifications_as_read
+    mark_all_notifications_as_read,
+    mark_notifications_as_read,
+    serialize_notification,
+    push_unread_count,
+    reconcile_unread_counts
 )
 from utils.date_utils import to_datetime_str
+from utils.session_token import clear_session_cookie
+from utils.kakao_client import get_client_stats
+from utils.indexes import ensure_indexes, check_hot_queries
+from utils.study_search import build_search_fields, reindex_studies
+from utils.cache_version import bump_collection_version
+from utils.notification_retention import (
+    compact_notifications,
+    get_retention_stats,
+    start_compaction_worker,
+    sync_ttl_index
+)
+from utils.db_metrics import (
+    start_request_metrics,
+    finish_request_metrics,
+    get_route_stats
+)
 
 from flask import Flask, render_template, request, redirect, url_for, session
-from flask_socketio import SocketIO, join_room, leave_room, emit, send, disconnect
+from flask_socketio import join_room, leave_room, emit, send, disconnect
 from datetime import datetime, timedelta
+from utils.realtime import NOTIFICATION_NAMESPACE, socketio, user_room
 
+cfg = get_config()
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'secret!'
-socketio = SocketIO(app)
-cfg = get_config()
+socketio.init_app(app, message_queue=cfg.SOCKETIO_MESSAGE_QUEUE)
+
+_indexes_ready = False
+_indexes_lock = threading.Lock()
+
+
+@app.before_request
+def before_request_metrics():
+    start_request_metrics()
+
+
+@app.after_request
+def after_request_metrics(response):
+    return finish_request_metrics(response)
+
+
+@app.before_request
+def ensure_indexes_once():
+    """프로세스 시작 후 첫 요청에서 한 번만 인덱스를 생성합니다."""
+    global _indexes_ready
+
+    if _indexes_ready or not cfg.MONGO_ENSURE_INDEXES_ON_STARTUP:
+        return
+
+    with _indexes_lock:
+        if _indexes_ready:
+            return
+        # 데이터 이전(backfill/rebuild)은 요청을 막지 않도록 배포 단계의
+        # `flask migrate` 로만 실행한다
+        try:
+            ensure_indexes()
+        except Exception as e:
+            print(f"인덱스 생성 오류: {e}")
+        # 실패해도 매 요청마다 재시도하지 않는다 (CLI로 다시 실행 가능)
+        _indexes_ready = True
+
+
+@app.before_request
+def start_background_jobs():
+    """프로세스의 첫 요청에서 알림 정리 스레드를 시작합니다."""
+    start_compaction_worker()
 
 
 # TODO: 설정하지 않은 나머지 경로는 /study로 이동
@@ -75,28 +153,67 @@ def kakao_callback():
     return handle_kakao_callback(code)
 
 
-@app.route("/study")
-@token_required
-def study():
+def _study_list_args():
+    """스터디 목록/검색 조건 쿼리스트링을 정리합니다."""
     tab = request.args.get("tab", "all")  # 기본값: 전체 스터디
     search_keyword = request.args.get("searchKeyword", "")
     category = request.args.get("category")
-    
     is_closed = request.args.get("is_closed")
-    context={}
-    if is_closed is not None:
-        context["is_closed"] = is_closed
 
     # 유효한 탭인지 확인
     if tab not in ["all", "my", "applied"]:
         tab = "all"
-        
-    # 탭에 따라 스터디 데이터 조회
-    studies = get_studies_by_tab(request.current_user_id, tab, search_keyword, category, is_closed) 
 
-    return render_template('study.html', studies=studies, tab=tab, search_keyword=search_keyword, category=category, **context, to_datetime_str=to_datetime_str)
+    return tab, search_keyword, category, is_closed
 
 
+@app.route("/study")
+@token_required
+def study():
+    tab, search_keyword, category, is_closed = _study_list_args()
+
+    context={}
+    if is_closed is not None:
+        context["is_closed"] = is_closed
+
+    # 탭에 따라 스터디 데이터 조회 (첫 페이지)
+    studies, next_cursor = get_studies_by_tab(request.current_user_id, tab, search_keyword, category, is_closed)
+    # 카테고리별 모집중 스터디 수 (캐시된 집계)
+    facets = get_study_facets()
+
+    return render_template('study.html', studies=studies, next_cursor=next_cursor, tab=tab, search_keyword=search_keyword, category=category, facets=facets, **context, to_datetime_str=to_datetime_str)
+
+
+@app.route("/study/facets")
+@token_required
+def study_facets():
+    """카테고리별 모집중/마감 스터디 수를 반환합니다."""
+    return jsonify({'result': 'success', **get_study_facets()})
+
+
+@app.route("/study/list")
+@token_required
+def study_list_page():
+    """무한 스크롤용 다음 페이지 스터디 카드 조각을 반환합니다."""
+    if request.headers.get("X-Requested-With") != "XMLHttpRequest":
+        return make_response("잘못된 요청입니다.", 400)
+
+    tab, search_keyword, category, is_closed = _study_list_args()
+    studies, next_cursor = get_studies_by_tab(
+        request.current_user_id, tab, search_keyword, category, is_closed,
+        before=request.args.get("before"),
+    )
+
+    html = render_template(
+        "components/study/study_list_items.html",
+        studies=studies,
+        to_datetime_str=to_datetime_str
+    )
+    response = make_response(html, 200)
+    response.headers["Content-Type"] = "text/html; charset=utf-8"
+    response.headers["X-Next-Cursor"] = next_cursor or ""
+    return response
+
 
 @app.route("/study/create", methods=['GET'])
 @token_required
@@ -139,7 +256,8 @@ def create_study():
             if selected_date:
                 candidate.append({
                     "date": selected_date,
-                    "user_id": []  # 빈 배열로 초기화
+                    "user_id": [],  # 빈 배열로 초기화
+                    "count": 0      # 날짜별 지원자 수
                 })
 
         if not candidate:
@@ -156,10 +274,18 @@ def create_study():
             "max_participants": int(data.get("maxParticipants", 5)),
             "confirmed_candidate": [],  # 빈 배열로 초기화
             "is_closed": False,   # 빈 배열로 초기화
-            "study_date": ""           # 빈 문자열로 초기화
+            "study_date": "",          # 빈 문자열로 초기화
+            "version": 1,              # 변경될 때마다 1씩 증가
+            # 목록 카드용 카운터 (지원/확정/철회 시 함께 갱신)
+            "applicant_count": 0,
+            "confirmed_count": 0,
         }
+        study["seats_remaining"] = study["max_participants"]
+        # 검색용 n-gram 토큰 (생성 시점에 색인)
+        study.update(build_search_fields(study["name"], study["description"]))
 
         db.study.insert_one(study)
+        bump_collection_version("study")
         return jsonify({'result': 'success'})
 
     except ValueError:
@@ -172,30 +298,76 @@ def create_study():
 @app.route("/study/<string:study_id>")
 @token_required
 def study_detail(study_id):
-    study = get_study_by_id(study_id)
     current_user_id = request.current_user_id
+    # 쿼리스트링에서 탭 정보 가져오기
+    tab = request.args.get('tab', 'all')
 
-    # 스터디 호스트인 경우 참가자 정보도 함께 조회
-    confirmed_participants = []
-    pending_candidates = []
+    # 목록에서 받은 버전(v)으로 만든 ETag가 같으면 DB 조회 없이 304
+    listed_version = request.args.get("v")
+    if listed_version is not None:
+        etag = study_fragment_etag(study_id, listed_version, current_user_id, tab)
+        if request.if_none_match.contains(etag):
+            return _study_fragment_response(None, etag, versioned=True)
+
+    # 호스트라면 참가자 정보까지 같은 요청에서 함께 조회
+    study = get_study_with_participants(study_id, current_user_id)
+    if not study:
+        return make_response("스터디를 찾을 수 없습니다.", 404)
+
+    version = str(study.get("version", 0))
+    etag = study_fragment_etag(study_id, version, current_user_id, tab)
+    versioned = listed_version == version
+    if request.if_none_match.contains(etag):
+        return _study_fragment_response(None, etag, versioned)
+
+    role = get_viewer_role(study, current_user_id)
+    cache_key = (study_id, version, role, tab)
+    html = study_fragment_cache.get(cache_key)
+
+    if html is None:
+        # 스터디 호스트인 경우 참가자 정보 (이미 조회한 스터디 문서에서 분리)
+        confirmed_participants = []
+        pending_candidates = []
+        candidates_by_date = []
+
+        if role == "host":
+            confirmed_participants, pending_candidates, candidates_by_date = (
+                get_study_participants(study)
+            )
+
+        study["application_status"] = get_application_status(study, current_user_id)
+        html = render_template(
+            "components/study/study_detail_fragment.html",
+            study=study,
+            current_user_id=current_user_id,
+            confirmed_participants=confirmed_participants,
+            pending_candidates=pending_candidates,
+            candidates_by_date=candidates_by_date,
+            tab=tab, 
+            to_datetime_str=to_datetime_str
+        )
+        study_fragment_cache.set(cache_key, html)
 
-    if current_user_id == study.get("host_id"):
-        confirmed_participants, pending_candidates = get_study_participants(study_id)
+    return _study_fragment_response(html, etag, versioned)
 
-    # 쿼리스트링에서 탭 정보 가져오기
 
-    tab = request.args.get('tab', 'all')
-    html = render_template(
-        "components/study/study_detail_fragment.html",
-        study=study,
-        current_user_id=current_user_id,
-        confirmed_participants=confirmed_participants,
-        pending_candidates=pending_candidates,
-        tab=tab, 
-        to_datetime_str=to_datetime_str
-    )
-    response = make_response(html, 200)
-    response.headers["Content-Type"] = "text/html; charset=utf-8"
+def _study_fragment_response(html, etag, versioned):
+    """상세 조각 응답 (html이 None이면 304)"""
+    if html is None:
+        response = make_response("", 304)
+    else:
+        response = make_response(html, 200)
+        response.headers["Content-Type"] = "text/html; charset=utf-8"
+
+    response.set_etag(etag)
+    if versioned:
+        # 버전이 붙은 URL은 내용이 바뀌지 않으므로 탭 전환 사이에 재사용
+        response.headers["Cache-Control"] = (
+            f"private, max-age={cfg.STUDY_FRAGMENT_MAX_AGE}"
+        )
+    else:
+        response.headers["Cache-Control"] = "private, no-cache"
+    response.headers["Vary"] = "Cookie"
     return response
 
 
@@ -277,8 +449,18 @@ def confirm_candidates(study_id):
         if not study_date:
             return make_response("스터디 진행 날짜를 선택해주세요.", 400)
 
+        # 호스트 화면을 그릴 때의 스터디 버전 (동시 확정 방지)
+        expected_version = data.get("expected_version")
+        if expected_version is not None:
+            try:
+                expected_version = int(expected_version)
+            except (TypeError, ValueError):
+                return make_response("잘못된 요청입니다.", 400)
+
         success, message = update_confirmed_candidates(
-            study_id, confirmed_candidates, study_date
+            study_id, confirmed_candidates, study_date,
+            host_id=request.current_user_id,
+            expected_version=expected_version,
         )
 
         if success:
@@ -289,6 +471,23 @@ def confirm_candidates(study_id):
         return make_response("확정 처리 중 오류가 발생했습니다.", 500)
 
 
+@app.route("/study/<string:study_id>/recommended-dates")
+@token_required
+def study_recommended_dates(study_id):
+    if request.headers.get("X-Requested-With") != "XMLHttpRequest":
+        return make_response("잘못된 요청입니다.", 400)
+
+    success, result = get_date_recommendations(
+        study_id, request.current_user_id
+    )
+    if not success:
+        return jsonify({'result': 'error', 'message': result}), 404
+
+    response = jsonify({'result': 'success', **result})
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
 @app.route("/user/<string:user_id>/profile")
 @token_required
 def user_profile_api(user_id):
@@ -357,7 +556,8 @@ def delete_account():
     success, message = delete_user_account(request.current_user_id)
 
     if success:
-        return make_response(message, 200)
+        # 탈퇴한 사용자의 세션 토큰이 남지 않도록 삭제
+        return clear_session_cookie(make_response(message, 200))
     else:
         return make_response(message, 500)
 
@@ -365,23 +565,27 @@ def delete_account():
 @app.route("/notifications")
 @token_required
 def notifications():
-    """사용자 알림 목록을 반환합니다."""
+    """사용자 알림 목록을 한 페이지씩 반환합니다. (?before=<알림 _id>&limit=)"""
     if request.headers.get("X-Requested-With") != "XMLHttpRequest":
         return make_response("잘못된 요청입니다.", 400)
 
     try:
         user_id = request.current_user_id
-        notifications = get_user_notifications(user_id)
-
-        # MongoDB ObjectId를 문자열로 변환
-        for notification in notifications:
-            notification['_id'] = str(notification['_id'])
-            if 'created_at' in notification:
-                notification['created_at'] = notification['created_at'].isoformat()
+        limit = min(
+            request.args.get("limit", cfg.NOTIFICATION_PAGE_SIZE, type=int),
+            cfg.NOTIFICATION_MAX_PAGE_SIZE,
+        )
+        notifications, next_cursor = get_user_notifications(
+            user_id, limit=max(limit, 1), before=request.args.get("before")
+        )
 
         return jsonify({
             'success': True,
-            'notifications': notifications
+            'notifications': [
+                serialize_notification(notification)
+                for notification in notifications
+            ],
+            'next_cursor': next_cursor
         })
 
     except Exception as e:
@@ -422,6 +626,8 @@ def mark_notification_read(notification_id):
         success = mark_notification_as_read(notification_id, user_id)
 
         if success:
+            # 다른 탭/기기의 알림 배지도 갱신
+            push_unread_count(user_id)
             return jsonify({
                 'success': True,
                 'message': '알림이 읽음 처리되었습니다.'
@@ -434,6 +640,43 @@ def mark_notification_read(notification_id):
         return make_response("알림 처리 중 오류가 발생했습니다.", 500)
 
 
+@app.route("/notifications/read-batch", methods=["POST"])
+@token_required
+def mark_notifications_read_batch():
+    """여러 알림을 한 번에 읽음 처리합니다.
+
+    {"ids": [알림 _id, ...]} 또는 {"up_to": 알림 _id} (이 알림까지 모두)
+    """
+    if request.headers.get("X-Requested-With") != "XMLHttpRequest":
+        return make_response("잘못된 요청입니다.", 400)
+
+    try:
+        data = request.get_json(silent=True) or {}
+        ids = data.get("ids") or []
+        up_to = data.get("up_to")
+
+        if not isinstance(ids, list) or len(ids) > cfg.NOTIFICATION_READ_BATCH_MAX:
+            return make_response("잘못된 요청입니다.", 400)
+
+        user_id = request.current_user_id
+        count = mark_notifications_as_read(user_id, ids, up_to)
+        if count is None:
+            return make_response("잘못된 알림 ID입니다.", 400)
+
+        if count:
+            push_unread_count(user_id)
+
+        return jsonify({
+            'success': True,
+            'message': f'{count}개의 알림이 읽음 처리되었습니다.',
+            'count': count
+        })
+
+    except Exception as e:
+        print(f"알림 일괄 읽음 처리 오류: {e}")
+        return make_response("알림 처리 중 오류가 발생했습니다.", 500)
+
+
 @app.route("/notifications/mark-all-read", methods=["POST"])
 @token_required
 def mark_all_notifications_read():
@@ -444,6 +687,7 @@ def mark_all_notifications_read():
     try:
         user_id = request.current_user_id
         count = mark_all_notifications_as_read(user_id)
+        push_unread_count(user_id)
 
         return jsonify({
             'success': True,
@@ -462,6 +706,53 @@ def test():
     user = list(db.user.find({}))
     return jsonify({"count": len(user)})
 
+
+@app.route("/monitoring/db-pool")
+@monitoring_required
+def db_pool_stats():
+    """MongoDB 커넥션 풀 통계를 반환합니다."""
+    return jsonify(get_pool_stats())
+
+
+@app.route("/monitoring/token-cache")
+@monitoring_required
+def token_cache_stats():
+    """카카오 토큰 검증 캐시 통계를 반환합니다."""
+    stats = token_cache.stats()
+    stats["refresh_single_flight"] = refresh_flight.stats()
+    return jsonify(stats)
+
+
+@app.route("/monitoring/kakao-client")
+@monitoring_required
+def kakao_client_stats():
+    """카카오 API 클라이언트(서킷 브레이커) 상태를 반환합니다."""
+    return jsonify(get_client_stats())
+
+
+@app.route("/monitoring/study-cache")
+@monitoring_required
+def study_cache_stats():
+    """스터디 목록 캐시 통계를 반환합니다."""
+    return jsonify({
+        "list": study_list_cache.stats(),
+        "fragment": study_fragment_cache.stats(),
+    })
+
+
+@app.route("/monitoring/db-routes")
+@monitoring_required
+def db_route_stats():
+    """라우트별 MongoDB 명령 수와 소요 시간 집계를 반환합니다."""
+    return jsonify(get_route_stats())
+
+
+@app.route("/monitoring/notification-retention")
+@monitoring_required
+def notification_retention_stats():
+    """알림 보관 정책 설정과 정리 작업 진행/삭제 통계를 반환합니다."""
+    return jsonify(get_retention_stats())
+
 # 현재 생성된 방들
 rooms = {}
 
@@ -556,6 +847,19 @@ def message(data):
 def connect():
     return
 
+
+@socketio.on("connect", namespace=NOTIFICATION_NAMESPACE)
+def connect_notifications():
+    # 로그인한 사용자는 개인 알림 채널에 참여하고 현재 읽지 않은 알림 개수를 받는다
+    # (인증되지 않으면 클라이언트가 /notifications/unread-count 를 직접 조회)
+    # 화상 채팅 방과 네임스페이스를 나눠서 페이지 이동 시 방 disconnect 가 실행되지 않게 한다
+    user_id = get_socket_user_id()
+    if user_id:
+        join_room(user_room(user_id))
+        emit("unread_count", {
+            "count": get_unread_notification_count(user_id)
+        })
+
 @socketio.on("disconnect")
 def disconnect():
     print('asd')
@@ -569,6 +873,131 @@ def disconnect():
     emit("user-left", {"userId": user_id}, room=room)   
 
 
+@app.cli.command("ensure-indexes")
+def ensure_indexes_command():
+    """등록된 MongoDB 인덱스를 생성합니다."""
+    for collection, names in ensure_indexes().items():
+        click.echo(f"{collection}: {names}")
+
+
+@app.cli.command("migrate")
+def migrate_command():
+    """배포 시 한 번 실행: 인덱스 생성과 기존 데이터 이전을 수행합니다."""
+    for collection, names in ensure_indexes().items():
+        click.echo(f"{collection}: {names}")
+    # 검색 토큰이 없는 기존 스터디 색인
+    click.echo(f"색인한 스터디 수: {reindex_studies(only_missing=True)}")
+    # 날짜별 지원자 수가 없는 기존 스터디 채우기
+    click.echo(
+        f"날짜별 지원자 수 갱신: {backfill_candidate_counts(only_missing=True)}"
+    )
+    # 목록 카드용 카운터가 없는 기존 스터디 채우기
+    click.echo(
+        f"카드 카운터 갱신: {backfill_study_counters(only_missing=True)}"
+    )
+    # 지원 스터디 목록(user_study)이 없으면 처음 한 번 생성
+    count = rebuild_user_study_index(only_if_empty=True)
+    if count is None:
+        click.echo("지원 스터디 목록: 이미 생성됨")
+    else:
+        click.echo(f"생성한 사용자 목록 수: {count}")
+
+
+@app.cli.command("check-indexes")
+def check_indexes_command():
+    """주요 쿼리가 COLLSCAN으로 실행되는지 확인합니다."""
+    ok, report = check_hot_queries()
+    for item in report:
+        status = "FAIL" if item["collscan"] or item["error"] else "OK"
+        detail = item["error"] or " > ".join(item["stages"])
+        click.echo(f"[{status}] {item['collection']}.{item['name']}: {detail}")
+
+    if not ok:
+        raise SystemExit(1)
+
+
+@app.cli.command("backfill-candidate-counts")
+@click.option("--missing-only", is_flag=True, help="count가 없는 스터디만 계산")
+def backfill_candidate_counts_command(missing_only):
+    """스터디 날짜별 지원자 수를 다시 계산합니다."""
+    updated = backfill_candidate_counts(only_missing=missing_only)
+    click.echo(f"갱신한 스터디 수: {updated}")
+
+
+@app.cli.command("backfill-study-counters")
+@click.option("--missing-only", is_flag=True, help="카운터가 없는 스터디만 계산")
+def backfill_study_counters_command(missing_only):
+    """스터디 목록 카드용 카운터를 다시 계산합니다."""
+    updated = backfill_study_counters(only_missing=missing_only)
+    click.echo(f"갱신한 스터디 수: {updated}")
+
+
+@app.cli.command("check-user-study")
+def check_user_study_command():
+    """사용자별 지원 스터디 목록이 스터디 데이터와 일치하는지 확인합니다."""
+    ok, mismatches = check_user_study_index()
+    for item in mismatches:
+        click.echo(
+            f"[FAIL] {item['user_id']}: "
+            f"missing={item['missing']} extra={item['extra']}"
+        )
+    click.echo("OK" if ok else f"불일치 사용자 수: {len(mismatches)}")
+
+    if not ok:
+        raise SystemExit(1)
+
+
+@app.cli.command("rebuild-user-study")
+def rebuild_user_study_command():
+    """사용자별 지원 스터디 목록을 스터디 데이터로 다시 만듭니다."""
+    count = rebuild_user_study_index()
+    click.echo(f"생성한 사용자 목록 수: {count}")
+
+
+@app.cli.command("reconcile-unread-counts")
+def reconcile_unread_counts_command():
+    """사용자별 읽지 않은 알림 개수를 실제 알림 데이터로 다시 맞춥니다."""
+    fixed = reconcile_unread_counts()
+    click.echo(f"수정한 사용자 수: {fixed}")
+
+
+@app.cli.command("compact-notifications")
+@click.option("--max-per-user", type=int, default=None,
+              help="사용자별 보관할 최대 알림 수 (기본: 설정 값)")
+def compact_notifications_command(max_per_user):
+    """사용자별 보관 개수를 넘는 오래된 알림을 정리합니다."""
+    deleted = compact_notifications(max_per_user=max_per_user, force=True)
+    if deleted is None:
+        click.echo("다른 프로세스가 알림을 정리하는 중입니다.")
+        raise SystemExit(1)
+    stats = get_retention_stats()
+    click.echo(
+        f"정리한 사용자 수: {stats['last_users_compacted']}, "
+        f"삭제한 알림 수: {deleted}"
+    )
+    if stats["last_error"]:
+        click.echo(f"오류: {stats['last_error']}")
+        raise SystemExit(1)
+
+
+@app.cli.command("sync-notification-ttl")
+def sync_notification_ttl_command():
+    """읽은 알림 TTL 인덱스의 보관 기간을 현재 설정으로 변경합니다."""
+    if not sync_ttl_index():
+        raise SystemExit(1)
+    click.echo(
+        f"읽은 알림 보관 기간: {cfg.NOTIFICATION_READ_RETENTION_DAYS}일"
+    )
+
+
+@app.cli.command("reindex-study-search")
+@click.option("--missing-only", is_flag=True, help="토큰이 없는 스터디만 색인")
+def reindex_study_search_command(missing_only):
+    """스터디 검색 토큰을 다시 계산합니다."""
+    updated = reindex_studies(only_missing=missing_only)
+    click.echo(f"색인한 스터디 수: {updated}")
+
+
 if __name__ == "__main__":
     socketio.run(app, "0.0.0.0", port=5001, debug=True)
     # app.run("0.0.0.0", port=5001, debug=True)
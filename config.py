@@ -12,11 +12,133 @@ class BaseConfig:
     # authSource는 보통 admin
     MONGO_AUTH_SOURCE = os.environ.get("MONGO_AUTH_SOURCE")
 
+    # MongoDB 커넥션 풀 (프로세스당 MongoClient 하나를 공유)
+    MONGO_MAX_POOL_SIZE = int(os.environ.get("MONGO_MAX_POOL_SIZE", 50))
+    MONGO_MIN_POOL_SIZE = int(os.environ.get("MONGO_MIN_POOL_SIZE", 0))
+    # 풀이 가득 찼을 때 커넥션을 기다리는 최대 시간(ms)
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(
+        os.environ.get("MONGO_WAIT_QUEUE_TIMEOUT_MS", 5000)
+    )
+    # 유휴 커넥션을 닫기까지의 시간(ms)
+    MONGO_MAX_IDLE_TIME_MS = int(
+        os.environ.get("MONGO_MAX_IDLE_TIME_MS", 60000)
+    )
+    # 한 요청에서 같은 형태의 쿼리가 이 횟수보다 많으면 N+1 경고
+    DB_N_PLUS_ONE_THRESHOLD = int(os.environ.get("DB_N_PLUS_ONE_THRESHOLD", 3))
+    # 응답에 X-DB-* 헤더(쿼리 수/시간/가장 느린 쿼리)를 붙일지 여부 (개발용)
+    # 컬렉션/쿼리 구조가 노출되므로 기본은 꺼져 있다
+    DB_METRICS_HEADERS = os.environ.get(
+        "DB_METRICS_HEADERS", "false"
+    ).lower() in ("true", "1", "yes", "on")
+    # 서버 시작 후 첫 요청에서 인덱스를 생성할지 여부
+    MONGO_ENSURE_INDEXES_ON_STARTUP = os.environ.get(
+        "MONGO_ENSURE_INDEXES_ON_STARTUP", "true"
+    ).lower() in ("true", "1", "yes", "on")
+
     # 카카오 OAuth
     KAKAO_CLIENT_ID = os.environ.get("KAKAO_CLIENT_ID")
     KAKAO_CLIENT_SECRET = os.environ.get("KAKAO_CLIENT_SECRET")
     KAKAO_REDIRECT_URI = os.environ.get("KAKAO_REDIRECT_URI")
 
+    # 카카오 API HTTP 클라이언트 (keep-alive 세션 공유)
+    # 커넥션 풀 크기는 워커당 동시 요청 수에 맞춘다
+    KAKAO_POOL_MAXSIZE = int(os.environ.get("KAKAO_POOL_MAXSIZE", 20))
+    KAKAO_CONNECT_TIMEOUT = float(os.environ.get("KAKAO_CONNECT_TIMEOUT", 3.05))
+    KAKAO_READ_TIMEOUT = float(os.environ.get("KAKAO_READ_TIMEOUT", 5))
+    KAKAO_MAX_RETRIES = int(os.environ.get("KAKAO_MAX_RETRIES", 2))
+    KAKAO_RETRY_BACKOFF = float(os.environ.get("KAKAO_RETRY_BACKOFF", 0.2))
+    # 연속 실패가 이 횟수를 넘으면 일정 시간 동안 즉시 실패 처리
+    KAKAO_BREAKER_FAILURE_THRESHOLD = int(
+        os.environ.get("KAKAO_BREAKER_FAILURE_THRESHOLD", 5)
+    )
+    KAKAO_BREAKER_RESET_TIMEOUT = float(
+        os.environ.get("KAKAO_BREAKER_RESET_TIMEOUT", 30)
+    )
+
+    # 카카오 액세스 토큰 검증 결과 캐시
+    TOKEN_CACHE_MAX_SIZE = int(os.environ.get("TOKEN_CACHE_MAX_SIZE", 10000))
+    # 토큰 남은 유효시간(expires_in)과 이 값 중 작은 값만큼 캐시(초)
+    TOKEN_CACHE_MAX_TTL = int(os.environ.get("TOKEN_CACHE_MAX_TTL", 300))
+    # 같은 refresh_token으로 들어온 갱신 결과를 공유하는 시간(초)
+    KAKAO_REFRESH_SHARE_TTL = int(
+        os.environ.get("KAKAO_REFRESH_SHARE_TTL", 30)
+    )
+
+    # /monitoring/* 접근 토큰 (X-Monitoring-Token 헤더)
+    # 설정하지 않으면 모니터링 API는 모두 거부(403)
+    MONITORING_TOKEN = os.environ.get("MONITORING_TOKEN")
+
+    # 자체 세션 토큰(JWT) - 유효한 동안은 카카오 API 호출 없이 인증
+    # 기본값 없음: 설정되지 않으면 세션 토큰을 쓰지 않고 카카오 인증만 사용
+    SESSION_SECRET_KEY = os.environ.get("SESSION_SECRET_KEY")
+    # 키 교체 시 이전 키(쉼표 구분)로 서명된 토큰도 만료 전까지 검증
+    SESSION_PREVIOUS_SECRET_KEYS = [
+        key.strip()
+        for key in os.environ.get("SESSION_PREVIOUS_SECRET_KEYS", "").split(",")
+        if key.strip()
+    ]
+    SESSION_TOKEN_TTL = int(os.environ.get("SESSION_TOKEN_TTL", 900))
+    # 사용자별 세션 버전 캐시 시간 (로그아웃 후 다른 워커에 반영되는 최대 지연)
+    SESSION_VERSION_CACHE_TTL = int(
+        os.environ.get("SESSION_VERSION_CACHE_TTL", 30)
+    )
+
+    # 스터디 목록 한 페이지 크기 (무한 스크롤)
+    STUDY_PAGE_SIZE = int(os.environ.get("STUDY_PAGE_SIZE", 20))
+    # 스터디 목록 조회 결과 캐시 (study 컬렉션 버전이 바뀌면 무효화)
+    STUDY_LIST_CACHE_MAX_SIZE = int(
+        os.environ.get("STUDY_LIST_CACHE_MAX_SIZE", 512)
+    )
+    STUDY_LIST_CACHE_TTL = int(os.environ.get("STUDY_LIST_CACHE_TTL", 60))
+    # 스터디 상세 조각 HTML 캐시 (호스트 화면의 사용자 정보 때문에 TTL을 둔다)
+    STUDY_FRAGMENT_CACHE_MAX_SIZE = int(
+        os.environ.get("STUDY_FRAGMENT_CACHE_MAX_SIZE", 1024)
+    )
+    STUDY_FRAGMENT_CACHE_TTL = int(
+        os.environ.get("STUDY_FRAGMENT_CACHE_TTL", 60)
+    )
+    # 버전이 붙은 상세 조각 URL(?v=)을 브라우저가 재사용하는 시간(초)
+    STUDY_FRAGMENT_MAX_AGE = int(os.environ.get("STUDY_FRAGMENT_MAX_AGE", 300))
+
+    # 알림 드롭다운 한 페이지 크기 (스크롤하면 이전 알림을 이어서 조회)
+    NOTIFICATION_PAGE_SIZE = int(os.environ.get("NOTIFICATION_PAGE_SIZE", 20))
+    NOTIFICATION_MAX_PAGE_SIZE = int(
+        os.environ.get("NOTIFICATION_MAX_PAGE_SIZE", 50)
+    )
+
+    # 한 번에 읽음 처리할 수 있는 알림 ID 수
+    NOTIFICATION_READ_BATCH_MAX = int(
+        os.environ.get("NOTIFICATION_READ_BATCH_MAX", 200)
+    )
+
+    # 알림 보관 정책
+    # 읽은 알림은 읽은 시점(read_at)부터 이 기간이 지나면 TTL 인덱스로 삭제(일)
+    NOTIFICATION_READ_RETENTION_DAYS = int(
+        os.environ.get("NOTIFICATION_READ_RETENTION_DAYS", 30)
+    )
+    # 사용자별로 보관하는 최대 알림 수 (넘으면 오래된 것부터 정리)
+    NOTIFICATION_MAX_PER_USER = int(
+        os.environ.get("NOTIFICATION_MAX_PER_USER", 200)
+    )
+    NOTIFICATION_COMPACTION_BATCH_SIZE = int(
+        os.environ.get("NOTIFICATION_COMPACTION_BATCH_SIZE", 500)
+    )
+    # 백그라운드 정리 주기(초), 0이면 백그라운드 정리를 하지 않음 (CLI로만 실행)
+    NOTIFICATION_COMPACTION_INTERVAL = int(
+        os.environ.get("NOTIFICATION_COMPACTION_INTERVAL", 3600)
+    )
+    # 정리 작업 임대 시간(초) - 여러 프로세스 중 하나만 정리하며, 사용자마다 연장
+    NOTIFICATION_COMPACTION_LEASE_TTL = int(
+        os.environ.get("NOTIFICATION_COMPACTION_LEASE_TTL", 300)
+    )
+
+    # 응답 후 처리할 작업(알림 생성/메일 발송)용 백그라운드 스레드 수
+    BACKGROUND_MAX_WORKERS = int(os.environ.get("BACKGROUND_MAX_WORKERS", 4))
+
+    # 여러 프로세스에서 Socket.IO 이벤트를 보낼 때 쓰는 메시지 큐 (예: redis://)
+    # 단일 프로세스면 비워 둔다
+    SOCKETIO_MESSAGE_QUEUE = os.environ.get("SOCKETIO_MESSAGE_QUEUE")
+
     # SMTP
     GMAIL_USER = os.environ.get("GMAIL_USER")
     GMAIL_APP_PASSWORD = os.environ.get("GMAIL_APP_PASSWORD")
@@ -1,14 +1,158 @@
+import atexit
+import os
+import threading
+
 from config import get_config
-from pymongo import MongoClient
+from pymongo import MongoClient, monitoring
+from utils.db_metrics import command_metrics
 
 cfg = get_config()
 
+DB_NAME = 'kaeal-study'
+
+# 프로세스 전역에서 공유하는 MongoClient
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """커넥션 풀 이벤트를 집계해서 모니터링용 통계를 만듭니다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.created = 0
+            self.closed = 0
+            self.checked_out = 0
+            self.checkout_failed = 0
+            self.pools_cleared = 0
+
+    def _incr(self, name, value=1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + value)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._incr("pools_cleared")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._incr("created")
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._incr("closed")
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._incr("checkout_failed")
+
+    def connection_checked_out(self, event):
+        self._incr("checked_out")
+
+    def connection_checked_in(self, event):
+        self._incr("checked_out", -1)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "connections_created": self.created,
+                "connections_closed": self.closed,
+                "connections_open": self.created - self.closed,
+                "connections_in_use": self.checked_out,
+                "checkout_failed": self.checkout_failed,
+                "pools_cleared": self.pools_cleared,
+            }
 
-def get_db():
-    mongo_uri = getattr(cfg, "MONGO_URI", cfg.MONGO_URI)
 
-    client = MongoClient(
-        mongo_uri,
-        27017
+pool_stats = PoolStatsListener()
+
+
+def _create_client():
+    return MongoClient(
+        cfg.MONGO_URI,
+        maxPoolSize=cfg.MONGO_MAX_POOL_SIZE,
+        minPoolSize=cfg.MONGO_MIN_POOL_SIZE,
+        waitQueueTimeoutMS=cfg.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        maxIdleTimeMS=cfg.MONGO_MAX_IDLE_TIME_MS,
+        event_listeners=[pool_stats, command_metrics],
     )
-    return client['kaeal-study']
+
+
+def get_client():
+    """프로세스 전역 MongoClient를 반환합니다. (없으면 생성)"""
+    global _client, _client_pid
+
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _client_lock:
+        if _client is None or _client_pid != pid:
+            # fork된 자식 프로세스에서는 부모의 클라이언트를 쓰지 않고 새로 만든다
+            _client = _create_client()
+            _client_pid = pid
+        return _client
+
+
+def get_db():
+    return get_client()[DB_NAME]
+
+
+def reset_client():
+    """fork 이후 자식 프로세스에서 클라이언트를 버리고 다시 만들도록 합니다."""
+    global _client, _client_pid, _client_lock
+
+    # 부모의 락 상태를 물려받지 않도록 락도 새로 만든다
+    _client_lock = threading.Lock()
+    _client = None
+    _client_pid = None
+    pool_stats.reset()
+
+
+def close_client():
+    """공유 클라이언트를 닫습니다. (프로세스 종료 시)"""
+    global _client, _client_pid
+
+    with _client_lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+
+
+def get_pool_stats():
+    """커넥션 풀 설정과 현재 사용 현황을 반환합니다."""
+    stats = pool_stats.snapshot()
+    stats.update({
+        "pid": os.getpid(),
+        "client_initialized": _client is not None
+        and _client_pid == os.getpid(),
+        "max_pool_size": cfg.MONGO_MAX_POOL_SIZE,
+        "min_pool_size": cfg.MONGO_MIN_POOL_SIZE,
+        "wait_queue_timeout_ms": cfg.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "max_idle_time_ms": cfg.MONGO_MAX_IDLE_TIME_MS,
+    })
+    return stats
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_client)
+
+# 프로세스 종료 시 커넥션 풀을 정리 (fork된 자식은 자기 클라이언트만 닫는다)
+atexit.register(close_client)
@@ -14,6 +14,7 @@ async function withdrawApplication(studyId) {
 
     if (response.ok) {
       alert("지원이 철회되었습니다.");
+      if (typeof markStudyStale === "function") markStudyStale(studyId);
       // 페이지 새로고침 또는 상세보기 닫기
       closeDetail();
     } else {
@@ -49,6 +50,7 @@ async function applyToStudy(studyId) {
     });
     if (response.ok) {
       alert("스터디 참여 신청이 완료되었습니다!");
+      if (typeof markStudyStale === "function") markStudyStale(studyId);
       closeDetail();
     } else {
       const errorText = await response.text();
@@ -124,6 +124,44 @@ function hideConfirmLoading() {
   }
 }
 
+// 날짜별 지원자 수로 계산한 추천 날짜를 표시하고 미리 선택
+async function loadDateRecommendations() {
+  const container = document.getElementById("date-recommendations");
+  if (!container) return;
+
+  try {
+    const response = await fetch(
+      `/study/${container.dataset.studyId}/recommended-dates`,
+      {
+        headers: {
+          "X-Requested-With": "XMLHttpRequest",
+        },
+      }
+    );
+    if (!response.ok) return;
+
+    const data = await response.json();
+    if (!data.best_date) return;
+
+    const best = data.dates[0];
+    const radio = document.querySelector(
+      `input[name="study_date"][value="${best.date}"]`
+    );
+    const label = radio
+      ? radio.closest("label").querySelector("span").textContent
+      : best.date;
+
+    container.textContent = `추천 날짜: ${label} (지원 ${best.count}명, 최대 ${data.max_participants}명 중 ${best.fillable}명 참여 가능)`;
+    container.classList.remove("hidden");
+
+    if (radio && !document.querySelector('input[name="study_date"]:checked')) {
+      radio.checked = true;
+    }
+  } catch (error) {
+    console.error("날짜 추천을 불러오는데 실패했습니다:", error);
+  }
+}
+
 async function confirmCandidates(studyId) {
   // 선택된 날짜 확인
   const selectedDate = document.querySelector(
@@ -153,9 +191,12 @@ async function confirmCandidates(studyId) {
   showConfirmLoading();
 
   try {
+    // 화면을 그릴 때의 스터디 버전 (그 사이 변경되었으면 서버에서 거절)
+    const confirmBtn = document.getElementById("confirm-btn");
     const requestBody = {
       confirmed_candidates: allConfirmedIds,
       study_date: selectedDate.value,
+      expected_version: confirmBtn ? confirmBtn.dataset.version : undefined,
     };
 
     const response = await fetch(`/study/${studyId}/confirm-candidates`, {
@@ -169,6 +210,7 @@ async function confirmCandidates(studyId) {
 
     if (response.ok) {
       alert("참가자가 확정되었습니다!");
+      if (typeof markStudyStale === "function") markStudyStale(studyId);
       closeDetail();
     } else {
       const errorText = await response.text();
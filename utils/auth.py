@@ -1,12 +1,117 @@
-import requests
+import hashlib
+import hmac
 from datetime import datetime, timezone
 from flask import request, redirect, url_for, make_response
 from functools import wraps
 from config import get_config
 from db import get_db
+from utils.cache import LRUTTLCache
+from utils.cache_version import bump_collection_version
+from utils import kakao_client
+from utils.kakao_client import KakaoUnavailableError
+from utils.single_flight import SingleFlight
+from utils.user_study import delete_user_studies, remove_studies_from_all
+from utils.study import remove_user_pipeline
+from utils.session_token import (
+    SESSION_COOKIE_NAME,
+    verify_session_token,
+    set_session_cookie,
+    clear_session_cookie,
+    revoke_user_sessions,
+)
 
 cfg = get_config()
 
+# 액세스 토큰 해시 -> 카카오 사용자 ID
+token_cache = LRUTTLCache(
+    max_size=cfg.TOKEN_CACHE_MAX_SIZE,
+    default_ttl=cfg.TOKEN_CACHE_MAX_TTL,
+)
+
+# 리프레시 토큰 해시 기준으로 동시 갱신 요청을 하나로 합친다
+refresh_flight = SingleFlight()
+# 직후에 도착한 요청이 같은 갱신 결과를 받도록 잠시 보관
+refresh_results = LRUTTLCache(
+    max_size=cfg.TOKEN_CACHE_MAX_SIZE,
+    default_ttl=cfg.KAKAO_REFRESH_SHARE_TTL,
+)
+
+
+def _token_cache_key(access_token):
+    # 토큰 원문을 메모리에 남기지 않도록 해시값을 키로 사용
+    return hashlib.sha256(access_token.encode("utf-8")).hexdigest()
+
+
+def cache_verified_token(access_token, user_id, expires_in):
+    """검증된 토큰을 남은 유효시간 안에서만 캐시합니다."""
+    ttl = min(int(expires_in or 0), cfg.TOKEN_CACHE_MAX_TTL)
+    token_cache.set(_token_cache_key(access_token), str(user_id), ttl=ttl)
+
+
+def get_cached_user_id(access_token):
+    return token_cache.get(_token_cache_key(access_token))
+
+
+def invalidate_token(access_token):
+    if access_token:
+        token_cache.delete(_token_cache_key(access_token))
+
+
+def verify_access_token(access_token):
+    """액세스 토큰을 검증하고 카카오 사용자 ID를 반환합니다. (실패시 None)"""
+    user_id = get_cached_user_id(access_token)
+    if user_id:
+        return user_id
+
+    # access_token_info 응답에 사용자 ID와 남은 유효시간이 함께 온다
+    token_info = kakao_client.get_access_token_info(access_token)
+    if not token_info or "id" not in token_info:
+        return None
+
+    user_id = str(token_info["id"])
+    cache_verified_token(access_token, user_id, token_info.get("expires_in"))
+    return user_id
+
+
+def monitoring_required(f):
+    """모니터링 API 보호 - X-Monitoring-Token 헤더가 설정된 토큰과 같을 때만 허용"""
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        # 토큰이 없으면 항상 거부 (프록시 뒤에서는 모든 요청이 localhost로 보이므로)
+        allowed = False
+        if cfg.MONITORING_TOKEN:
+            token = request.headers.get("X-Monitoring-Token", "")
+            allowed = hmac.compare_digest(
+                token.encode("utf-8"), cfg.MONITORING_TOKEN.encode("utf-8")
+            )
+
+        if not allowed:
+            return make_response("접근 권한이 없습니다.", 403)
+        return f(*args, **kwargs)
+
+    return decorated
+
+
+def get_socket_user_id():
+    """소켓 연결 요청의 쿠키로 사용자 ID를 확인합니다. (실패시 None)
+
+    소켓 핸드셰이크에서는 쿠키를 다시 설정할 수 없으므로 토큰 갱신은 하지 않고,
+    세션 토큰이 만료되었으면 카카오 액세스 토큰(캐시 우선)으로 확인한다.
+    """
+    user_id = verify_session_token(request.cookies.get(SESSION_COOKIE_NAME))
+    if user_id:
+        return user_id
+
+    access_token = request.cookies.get("access_token")
+    if not access_token:
+        return None
+
+    try:
+        return verify_access_token(access_token)
+    except KakaoUnavailableError as e:
+        print(f"카카오 인증 서버 오류: {e}")
+        return None
+
 
 def get_token_from_request():
     auth_header = request.headers.get("Authorization")
@@ -26,54 +131,67 @@ def get_token_from_request():
 def token_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
+        # 자체 세션 토큰이 유효하면 외부 호출 없이 바로 인증
+        session_user_id = verify_session_token(
+            request.cookies.get(SESSION_COOKIE_NAME)
+        )
+        if session_user_id:
+            request.current_user_id = session_user_id
+            return f(*args, **kwargs)
+
         access_token, refresh_token = get_token_from_request()
 
         need_token_refresh = False
+        user_id = None
+
+        try:
+            if access_token:
+                # access_token이 있으면 유효한지 확인 (캐시 우선)
+                user_id = verify_access_token(access_token)
+
+            if not user_id:
+                # access_token이 없거나 만료되었으면 refresh_token으로 갱신
+                result = refresh_access_token(refresh_token)
+                if not isinstance(result, tuple):
+                    # 갱신 실패시 로그인 페이지로 리다이렉트
+                    return result
 
-        if not access_token:
-            # access_token이 없으면 refresh_token으로 갱신
-            result = refresh_access_token(refresh_token)
-            if isinstance(result, tuple):
                 (
                     access_token, expires_in, refresh_token,
                     refresh_token_expires_in
                 ) = result
                 need_token_refresh = True
-            else:
-                # 갱신 실패시 로그인 페이지로 리다이렉트
-                return result
-        else:
-            # access_token이 있으면 유효한지 확인
-            token_response = requests.get(
-                "https://kapi.kakao.com/v1/user/access_token_info",
-                headers={"Authorization": f"Bearer {access_token}"},
-            )
-            if token_response.status_code != 200:
-                # 토큰이 만료되었으면 refresh_token으로 갱신
-                result = refresh_access_token(refresh_token)
 
-                if isinstance(result, tuple):
-                    (
-                        access_token,
-                        expires_in,
-                        refresh_token,
-                        refresh_token_expires_in,
-                    ) = result
-                    need_token_refresh = True
-                else:
-                    # 갱신 실패시 로그인 페이지로 리다이렉트
-                    return result
+                # 새 토큰의 사용자 ID (갱신할 때 캐시해 둔 값을 우선 사용)
+                user_id = get_cached_user_id(access_token)
+                if not user_id:
+                    user_info = get_user_info(access_token)
+                    if not user_info:
+                        return redirect(url_for("login_page"))
+
+                    user_id = str(user_info["id"])
+                    cache_verified_token(access_token, user_id, expires_in)
+
+        except KakaoUnavailableError as e:
+            # 카카오 장애 시에는 로그인 페이지로 보내지 않고 바로 실패 응답
+            print(f"카카오 인증 서버 오류: {e}")
+            return make_response(
+                "인증 서버에 일시적으로 연결할 수 없습니다. "
+                "잠시 후 다시 시도해주세요.",
+                503,
+            )
 
-        # 사용자 정보를 request에 저장 (카카오 API에서 사용자 정보 가져오기
-        user_info = get_user_info(access_token)
-        request.current_user_id = str(user_info["id"])
+        request.current_user_id = user_id
 
         # 원래 함수 실행
         result = f(*args, **kwargs)
 
+        # 세션 토큰 재발급 (다음 요청부터는 카카오 호출 없이 인증)
+        response = make_response(result)
+        set_session_cookie(response, user_id)
+
         # 토큰 갱신이 필요하면 쿠키 설정
         if need_token_refresh:
-            response = make_response(result)
             response.set_cookie(
                 "access_token",
                 access_token,
@@ -90,9 +208,8 @@ def token_required(f):
                     httponly=True,
                     secure=False,
                 )
-            return response
 
-        return result
+        return response
 
     return decorated
 
@@ -102,6 +219,27 @@ def refresh_access_token(refresh_token):
     if not refresh_token:
         return redirect(url_for("login_page"))
 
+    # 같은 refresh_token으로 방금 갱신한 결과가 있으면 재사용
+    # (토큰 회전 후 이전 쿠키로 들어온 병렬 요청도 같은 토큰을 받는다)
+    key = _token_cache_key(refresh_token)
+    result = refresh_results.get(key)
+    if result is None:
+        # 동시에 들어온 갱신 요청은 하나만 카카오로 보낸다
+        result = refresh_flight.do(key, _refresh_tokens, refresh_token)
+        if result is not None:
+            refresh_results.set(
+                key, result,
+                ttl=min(cfg.KAKAO_REFRESH_SHARE_TTL, int(result[1]))
+            )
+
+    if result is None:
+        return redirect(url_for("login_page"))
+
+    return result
+
+
+def _refresh_tokens(refresh_token):
+    """카카오에 토큰 갱신을 요청합니다. (실패시 None)"""
     token_data = {
         "grant_type": "refresh_token",
         "client_id": cfg.KAKAO_CLIENT_ID,
@@ -109,17 +247,19 @@ def refresh_access_token(refresh_token):
         "refresh_token": refresh_token,
     }
 
-    token_response = requests.post(
-        "https://kauth.kakao.com/oauth/token", data=token_data
-    )
-    token_json = token_response.json()
+    token_json = kakao_client.request_token(token_data)
 
     if "access_token" not in token_json:
-        return redirect(url_for("login_page"))
+        return None
 
     access_token = token_json["access_token"]
     expires_in = token_json["expires_in"]
 
+    # 새 토큰의 사용자 ID도 한 번만 조회해서 캐시해 둔다
+    user_info = get_user_info(access_token)
+    if user_info:
+        cache_verified_token(access_token, user_info["id"], expires_in)
+
     # 토큰 만료기한이 1개월 미만일 때 갱신
     if "refresh_token" in token_json:
         refresh_token = token_json["refresh_token"]
@@ -134,12 +274,7 @@ def refresh_access_token(refresh_token):
 
 
 def get_user_info(access_token):
-    user_info_url = "https://kapi.kakao.com/v2/user/me"
-    user_response = requests.get(
-        user_info_url, headers={"Authorization": f"Bearer {access_token}"}
-    )
-
-    user_info = user_response.json()
+    user_info = kakao_client.get_user_me(access_token)
 
     if "id" not in user_info:
         return None
@@ -149,7 +284,6 @@ def get_user_info(access_token):
 
 def get_kakao_tokens_from_code(code):
     """카카오 인증 코드를 사용해서 토큰을 가져옵니다."""
-    token_url = "https://kauth.kakao.com/oauth/token"
     token_data = {
         "grant_type": "authorization_code",
         "client_id": cfg.KAKAO_CLIENT_ID,
@@ -158,8 +292,7 @@ def get_kakao_tokens_from_code(code):
         "code": code,
     }
 
-    token_response = requests.post(token_url, data=token_data)
-    token_json = token_response.json()
+    token_json = kakao_client.request_token(token_data)
 
     if "access_token" not in token_json:
         return None
@@ -191,6 +324,8 @@ def create_or_update_user(user_info):
             "email": email,
             "name": nickname,
             "created_at": datetime.now(timezone.utc),
+            # 읽지 않은 알림 개수 (알림 생성/읽음/삭제 시 $inc)
+            "unread_count": 0,
         }
         result = db.user.insert_one(user_data)
         return {"user_id": result.inserted_id, "is_new_user": True}
@@ -209,18 +344,26 @@ def handle_kakao_callback(code):
     if not code:
         return redirect(url_for("login_page"))
 
-    # 1. 인증 코드로 토큰 가져오기
-    tokens = get_kakao_tokens_from_code(code)
-    if not tokens:
-        return redirect(url_for("login_page"))
-
-    # 2. 토큰으로 사용자 정보 가져오기
-    user_info = get_user_info(tokens["access_token"])
-    if not user_info:
+    try:
+        # 1. 인증 코드로 토큰 가져오기
+        tokens = get_kakao_tokens_from_code(code)
+        if not tokens:
+            return redirect(url_for("login_page"))
+
+        # 2. 토큰으로 사용자 정보 가져오기
+        user_info = get_user_info(tokens["access_token"])
+        if not user_info:
+            return redirect(url_for("login_page"))
+
+    except KakaoUnavailableError as e:
+        print(f"카카오 로그인 처리 오류: {e}")
         return redirect(url_for("login_page"))
 
     # 3. 사용자 생성/업데이트
     user_result = create_or_update_user(user_info)
+    cache_verified_token(
+        tokens["access_token"], user_info["id"], tokens["expires_in"]
+    )
 
     # 4. 리다이렉트 결정 (신규 사용자면 프로필, 기존 사용자면 스터디)
     redirect_url = "profile" if user_result["is_new_user"] else "study"
@@ -241,15 +384,28 @@ def handle_kakao_callback(code):
         httponly=True,
         secure=False,
     )
+    set_session_cookie(response, user_info["id"])
 
     return response
 
 
 def handle_logout():
     """로그아웃 처리 - 쿠키 삭제 후 로그인 페이지로 리다이렉트"""
+    access_token = request.cookies.get("access_token")
+    user_id = verify_session_token(
+        request.cookies.get(SESSION_COOKIE_NAME)
+    ) or (access_token and get_cached_user_id(access_token))
+
+    # 이미 발급된 세션 토큰이 쿠키 삭제 후에도 쓰이지 않도록 무효화
+    revoke_user_sessions(user_id)
+
+    # 캐시된 토큰 검증 결과도 함께 무효화
+    invalidate_token(access_token)
+
     response = make_response(redirect(url_for("login_page")))
     response.set_cookie("access_token", "", expires=0)
     response.set_cookie("refresh_token", "", expires=0)
+    clear_session_cookie(response)
     request.current_user_id = None
     return response
 
@@ -287,28 +443,38 @@ def delete_user_account(user_id):
         db = get_db()
 
         # 1. 사용자가 호스트인 스터디들 삭제
-        deleted_studies = db.study.delete_many({"host_id": user_id})
+        hosted_ids = [
+            study["_id"]
+            for study in db.study.find({"host_id": user_id}, {"_id": 1})
+        ]
+        deleted_studies = db.study.delete_many({"_id": {"$in": hosted_ids}})
+        remove_studies_from_all(hosted_ids)
         print(f"삭제된 스터디 수: {deleted_studies.deleted_count}")
 
-        # 2. 다른 스터디의 confirmed_candidate에서 사용자 제거
-        confirmed_result = db.study.update_many(
-            {"confirmed_candidate": user_id},
-            {"$pull": {"confirmed_candidate": user_id}}
-        )
-        print(f"confirmed_candidate에서 제거: {confirmed_result.modified_count}건")
-
-        # 3. 다른 스터디의 candidate.user_id에서 사용자 제거
-        candidate_result = db.study.update_many(
-            {"candidate.user_id": user_id},
-            {"$pull": {"candidate.$.user_id": user_id}}
+        # 2~3. 다른 스터디의 confirmed_candidate, candidate.user_id에서 사용자 제거
+        # (날짜별 지원자 수와 카드 카운터도 같은 업데이트에서 다시 계산)
+        removed_result = db.study.update_many(
+            {
+                "$or": [
+                    {"confirmed_candidate": user_id},
+                    {"candidate.user_id": user_id},
+                ]
+            },
+            remove_user_pipeline(user_id),
         )
-        print(f"candidate에서 제거: {candidate_result.modified_count}건")
+        print(f"참가자/지원자에서 제거: {removed_result.modified_count}건")
+        bump_collection_version("study")
 
         # 4. 사용자와 관련된 알림 삭제 (있다면)
         db.notification.delete_many({"user_id": user_id})
 
-        # 5. 사용자 계정 삭제
+        # 5. 사용자의 지원 스터디 목록 삭제
+        delete_user_studies(user_id)
+
+        # 6. 사용자 계정 삭제
         deleted_user = db.user.delete_one({"id": user_id})
+        # 남아 있는 세션 토큰도 즉시 무효화 (없는 사용자는 검증 실패)
+        revoke_user_sessions(user_id)
 
         if deleted_user.deleted_count > 0:
             return True, "회원탈퇴가 완료되었습니다."
@@ -0,0 +1,48 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from config import get_config
+
+cfg = get_config()
+
+# 요청 처리와 무관하게 나중에 실행해도 되는 작업용 스레드 풀
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=cfg.BACKGROUND_MAX_WORKERS,
+                    thread_name_prefix="background",
+                )
+    return _executor
+
+
+def _run(fn, args, kwargs):
+    try:
+        fn(*args, **kwargs)
+    except Exception as e:
+        print(f"백그라운드 작업 오류 ({fn.__name__}): {e}")
+
+
+def submit_background(fn, *args, **kwargs):
+    """응답을 기다리게 하지 않도록 작업을 백그라운드 스레드에서 실행합니다."""
+    return _get_executor().submit(_run, fn, args, kwargs)
+
+
+def reset_executor():
+    """fork 이후 부모 프로세스의 스레드 풀을 쓰지 않도록 버립니다."""
+    global _executor, _executor_lock
+
+    _executor_lock = threading.Lock()
+    _executor = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_executor)
@@ -0,0 +1,70 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LRUTTLCache:
+    """크기 제한(LRU)과 항목별 만료 시간(TTL)을 가진 스레드 안전 캐시"""
+
+    def __init__(self, max_size=1024, default_ttl=60):
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at <= now:
+                # 만료된 항목은 바로 제거
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+
+        expires_at = time.monotonic() + ttl
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+
+            # 가장 오래 사용하지 않은 항목부터 제거
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
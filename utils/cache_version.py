@@ -0,0 +1,27 @@
+from pymongo import ReturnDocument
+from db import get_db
+
+# 컬렉션별 데이터 버전 (쓰기가 일어날 때마다 1씩 증가)
+# 여러 워커 프로세스가 같은 값을 보도록 DB에 저장한다
+VERSION_COLLECTION = "cache_version"
+
+
+def get_collection_version(name):
+    """캐시 키에 사용할 컬렉션의 현재 버전을 반환합니다."""
+    doc = get_db()[VERSION_COLLECTION].find_one({"_id": name})
+    return doc["version"] if doc else 0
+
+
+def bump_collection_version(name):
+    """컬렉션 버전을 올려서 해당 컬렉션 기반 캐시를 무효화합니다."""
+    try:
+        doc = get_db()[VERSION_COLLECTION].find_one_and_update(
+            {"_id": name},
+            {"$inc": {"version": 1}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        return doc["version"]
+    except Exception as e:
+        print(f"캐시 버전 갱신 오류 ({name}): {e}")
+        return None
@@ -0,0 +1,166 @@
+import threading
+from collections import Counter
+
+from flask import g, has_request_context, request
+from pymongo import monitoring
+from config import get_config
+
+cfg = get_config()
+
+# 요청 단위 집계에서 제외할 내부 명령
+IGNORED_COMMANDS = {
+    "hello", "ismaster", "isMaster", "ping", "endSessions", "saslStart",
+    "saslContinue", "buildInfo",
+}
+
+# url_rule 이 없는 요청(404 등)을 모아서 집계하는 라우트 이름
+UNMATCHED_ROUTE = "<unmatched>"
+
+_route_stats = {}
+_route_stats_lock = threading.Lock()
+
+
+def _shape(value):
+    """쿼리 값을 지우고 구조만 남깁니다. {"id": "abc"} -> {"id": "?"}"""
+    if isinstance(value, dict):
+        return "{" + ",".join(
+            f"{key}:{_shape(value[key])}" for key in sorted(value)
+        ) + "}"
+    if isinstance(value, list):
+        return "[" + ",".join(sorted({_shape(item) for item in value})) + "]"
+    return "?"
+
+
+def _query_shape(command_name, command):
+    if command_name == "getMore":
+        return f"getMore {command.get('collection')}"
+
+    collection = command.get(command_name)
+    if command_name in ("update", "delete"):
+        ops = command.get("updates") or command.get("deletes") or [{}]
+        target = ops[0].get("q", {})
+    elif command_name == "aggregate":
+        target = command.get("pipeline", [])
+    elif command_name == "findAndModify":
+        target = command.get("query", {})
+    else:
+        target = command.get("filter", command.get("query", {}))
+    return f"{command_name} {collection} {_shape(target)}"
+
+
+def _current_metrics():
+    if not has_request_context():
+        return None
+    return g.get("_db_metrics")
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """요청 처리 중 실행된 MongoDB 명령 수와 소요 시간을 기록합니다."""
+
+    def started(self, event):
+        metrics = _current_metrics()
+        if metrics is None or event.command_name in IGNORED_COMMANDS:
+            return
+        metrics["pending"][event.request_id] = _query_shape(
+            event.command_name, event.command
+        )
+
+    def _finished(self, event):
+        metrics = _current_metrics()
+        if metrics is None:
+            return
+        shape = metrics["pending"].pop(event.request_id, None)
+        if shape is None:
+            return
+
+        elapsed_ms = event.duration_micros / 1000
+        metrics["count"] += 1
+        metrics["total_ms"] += elapsed_ms
+        metrics["shapes"][shape] += 1
+        if elapsed_ms > metrics["slowest_ms"]:
+            metrics["slowest_ms"] = elapsed_ms
+            metrics["slowest"] = shape
+
+    def succeeded(self, event):
+        self._finished(event)
+
+    def failed(self, event):
+        self._finished(event)
+
+
+command_metrics = CommandMetricsListener()
+
+
+def start_request_metrics():
+    g._db_metrics = {
+        "count": 0,
+        "total_ms": 0.0,
+        "slowest": None,
+        "slowest_ms": 0.0,
+        "shapes": Counter(),
+        "pending": {},
+    }
+
+
+def finish_request_metrics(response):
+    """라우트별 DB 통계를 집계합니다. (DB_METRICS_HEADERS 이면 응답 헤더에도 추가)"""
+    metrics = _current_metrics()
+    if metrics is None:
+        return response
+
+    # 매칭되지 않은 경로(404 등)는 하나로 모아서 집계가 무한히 늘어나지 않게 한다
+    route = request.url_rule.rule if request.url_rule else UNMATCHED_ROUTE
+    total_ms = round(metrics["total_ms"], 2)
+
+    if cfg.DB_METRICS_HEADERS:
+        response.headers["X-DB-Commands"] = str(metrics["count"])
+        response.headers["X-DB-Time-Ms"] = str(total_ms)
+        if metrics["slowest"]:
+            response.headers["X-DB-Slowest"] = (
+                f"{metrics['slowest']} ({round(metrics['slowest_ms'], 2)}ms)"
+            )
+
+    # 같은 형태의 쿼리가 한 요청에서 반복되면 N+1 의심
+    repeated = {
+        shape: count for shape, count in metrics["shapes"].items()
+        if count > cfg.DB_N_PLUS_ONE_THRESHOLD
+    }
+    for shape, count in repeated.items():
+        print(f"[N+1 의심] {request.method} {route}: "
+              f"같은 쿼리 {count}회 실행 - {shape}")
+
+    with _route_stats_lock:
+        stats = _route_stats.setdefault(route, {
+            "requests": 0,
+            "commands": 0,
+            "db_time_ms": 0.0,
+            "max_commands": 0,
+            "max_db_time_ms": 0.0,
+            "n_plus_one_warnings": 0,
+        })
+        stats["requests"] += 1
+        stats["commands"] += metrics["count"]
+        stats["db_time_ms"] += metrics["total_ms"]
+        stats["max_commands"] = max(stats["max_commands"], metrics["count"])
+        stats["max_db_time_ms"] = max(stats["max_db_time_ms"], total_ms)
+        if repeated:
+            stats["n_plus_one_warnings"] += 1
+
+    return response
+
+
+def get_route_stats():
+    """라우트별 평균 DB 명령 수와 소요 시간을 반환합니다."""
+    with _route_stats_lock:
+        result = {}
+        for route, stats in _route_stats.items():
+            requests_count = stats["requests"] or 1
+            result[route] = dict(
+                stats,
+                db_time_ms=round(stats["db_time_ms"], 2),
+                avg_commands=round(stats["commands"] / requests_count, 2),
+                avg_db_time_ms=round(
+                    stats["db_time_ms"] / requests_count, 2
+                ),
+            )
+        return result
@@ -0,0 +1,174 @@
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+from config import get_config
+from db import get_db
+
+cfg = get_config()
+
+# 읽은 알림 보관 기간 TTL 인덱스 이름 (보관 기간 변경 시 collMod 대상)
+NOTIFICATION_TTL_INDEX = "notification_read_at_ttl"
+
+# 컬렉션별 인덱스 정의
+# (keys, options) - options는 create_index 옵션과 동일
+INDEX_REGISTRY = {
+    "study": [
+        ([("id", ASCENDING)], {"unique": True}),
+        ([("host_id", ASCENDING), ("_id", DESCENDING)], {}),
+        ([("candidate.user_id", ASCENDING)], {}),
+        ([("confirmed_candidate", ASCENDING)], {}),
+        ([("subject", ASCENDING), ("is_closed", ASCENDING),
+          ("_id", DESCENDING)], {}),
+        ([("is_closed", ASCENDING), ("_id", DESCENDING)], {}),
+        # 검색용 n-gram 토큰 (multikey)
+        ([("search_tokens", ASCENDING)], {}),
+    ],
+    "user": [
+        ([("id", ASCENDING)], {"unique": True}),
+    ],
+    "notification": [
+        ([("id", ASCENDING)], {"unique": True}),
+        ([("user_id", ASCENDING), ("_id", DESCENDING)], {}),
+        ([("user_id", ASCENDING), ("read", ASCENDING),
+          ("_id", DESCENDING)], {}),
+        # 읽은 알림만 read_at 기준으로 자동 삭제
+        ([("read_at", ASCENDING)], {
+            "name": NOTIFICATION_TTL_INDEX,
+            "expireAfterSeconds": cfg.NOTIFICATION_READ_RETENTION_DAYS * 86400,
+            "partialFilterExpression": {"read": True},
+        }),
+    ],
+    "video_chat": [
+        ([("id", ASCENDING)], {"unique": True}),
+    ],
+    # _id(사용자 ID)는 기본 인덱스, 스터디 삭제 시 역방향 조회용
+    "user_study": [
+        ([("study_ids", ASCENDING)], {}),
+    ],
+}
+
+# 인덱스를 반드시 타야 하는 주요 쿼리 (explain으로 COLLSCAN 여부 확인)
+HOT_QUERIES = [
+    {
+        "name": "study_by_id",
+        "collection": "study",
+        "filter": {"id": "_"},
+    },
+    {
+        "name": "studies_by_host",
+        "collection": "study",
+        "filter": {"host_id": "_"},
+        "sort": [("_id", DESCENDING)],
+    },
+    {
+        "name": "studies_by_candidate",
+        "collection": "study",
+        "filter": {"candidate.user_id": "_"},
+    },
+    {
+        "name": "studies_by_confirmed",
+        "collection": "study",
+        "filter": {"confirmed_candidate": "_"},
+    },
+    {
+        "name": "studies_by_subject",
+        "collection": "study",
+        "filter": {"subject": "_", "is_closed": False},
+        "sort": [("_id", DESCENDING)],
+    },
+    {
+        "name": "studies_by_search_token",
+        "collection": "study",
+        "filter": {"search_tokens": {"$all": ["_", "__"]}},
+    },
+    {
+        "name": "user_by_id",
+        "collection": "user",
+        "filter": {"id": "_"},
+    },
+    {
+        "name": "notifications_by_user",
+        "collection": "notification",
+        "filter": {"user_id": "_"},
+        "sort": [("_id", DESCENDING)],
+    },
+    {
+        "name": "unread_notifications",
+        "collection": "notification",
+        "filter": {"user_id": "_", "read": False},
+    },
+    {
+        "name": "user_studies_by_study",
+        "collection": "user_study",
+        "filter": {"study_ids": "_"},
+    },
+    {
+        "name": "video_chat_by_id",
+        "collection": "video_chat",
+        "filter": {"id": "_"},
+    },
+]
+
+
+def ensure_indexes(db=None):
+    """등록된 인덱스를 생성합니다. (이미 있으면 그대로 둠)"""
+    db = db if db is not None else get_db()
+    result = {}
+
+    for collection, specs in INDEX_REGISTRY.items():
+        models = [IndexModel(keys, **options) for keys, options in specs]
+        try:
+            result[collection] = db[collection].create_indexes(models)
+        except OperationFailure as e:
+            # 같은 이름에 다른 옵션 / 중복 데이터로 unique 생성 실패 등
+            print(f"인덱스 생성 오류 ({collection}): {e}")
+            result[collection] = {"error": str(e)}
+
+    return result
+
+
+def _plan_stages(plan):
+    """explain 결과의 실행 계획에서 stage 이름들을 모읍니다."""
+    stages = [plan.get("stage")]
+    if "inputStage" in plan:
+        stages += _plan_stages(plan["inputStage"])
+    for child in plan.get("inputStages", []):
+        stages += _plan_stages(child)
+    return [stage for stage in stages if stage]
+
+
+def explain_hot_queries(db=None):
+    """주요 쿼리의 실행 계획을 확인해서 COLLSCAN 여부를 보고합니다."""
+    db = db if db is not None else get_db()
+    report = []
+
+    for query in HOT_QUERIES:
+        cursor = db[query["collection"]].find(query["filter"])
+        if query.get("sort"):
+            cursor = cursor.sort(query["sort"])
+
+        try:
+            plan = cursor.explain()["queryPlanner"]["winningPlan"]
+            # 버전에 따라 실행 계획이 queryPlan 아래에 있을 수 있다
+            plan = plan.get("queryPlan", plan)
+            stages = _plan_stages(plan)
+            error = None
+        except (OperationFailure, KeyError) as e:
+            stages = []
+            error = str(e)
+
+        report.append({
+            "name": query["name"],
+            "collection": query["collection"],
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages,
+            "error": error,
+        })
+
+    return report
+
+
+def check_hot_queries(db=None):
+    """COLLSCAN으로 실행되는 주요 쿼리가 없으면 True를 반환합니다."""
+    report = explain_hot_queries(db)
+    ok = not any(item["collscan"] or item["error"] for item in report)
+    return ok, report
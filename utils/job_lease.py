@@ -0,0 +1,91 @@
+import os
+import socket
+from datetime import datetime, timedelta, timezone
+
+from pymongo.errors import DuplicateKeyError
+from db import get_db
+
+# 여러 워커 프로세스 중 하나만 작업을 실행하도록 DB에 두는 작업별 임대(lease)
+# {_id: 작업 이름, owner: 보유 프로세스, expires_at: 임대 만료, next_run_at: 다음 실행 가능 시각}
+LEASE_COLLECTION = "job_lease"
+
+
+def lease_owner():
+    """현재 프로세스를 나타내는 임대 보유자 이름"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def acquire_lease(name, ttl, force=False):
+    """임대를 얻으면 True를 반환합니다.
+
+    다른 프로세스가 보유 중(만료 전)이면 실패하고, force가 아니면
+    next_run_at 이전에도 실패한다. (이번 주기에 이미 다른 프로세스가 실행함)
+    """
+    now = datetime.now(timezone.utc)
+    conditions = [{"expires_at": {"$lte": now}}]
+    if not force:
+        conditions.append({
+            "$or": [
+                {"next_run_at": {"$exists": False}},
+                {"next_run_at": {"$lte": now}},
+            ]
+        })
+
+    try:
+        get_db()[LEASE_COLLECTION].find_one_and_update(
+            {"_id": name, "$and": conditions},
+            {"$set": {
+                "owner": lease_owner(),
+                "acquired_at": now,
+                "expires_at": now + timedelta(seconds=ttl),
+            }},
+            upsert=True,
+        )
+        return True
+    except DuplicateKeyError:
+        # 조건에 맞지 않아 upsert가 기존 문서와 충돌 = 다른 프로세스가 보유 중
+        return False
+    except Exception as e:
+        print(f"작업 임대 획득 오류 ({name}): {e}")
+        return False
+
+
+def renew_lease(name, ttl):
+    """보유 중인 임대를 연장합니다. 이미 잃었으면 False"""
+    now = datetime.now(timezone.utc)
+    try:
+        result = get_db()[LEASE_COLLECTION].update_one(
+            {"_id": name, "owner": lease_owner()},
+            {"$set": {"expires_at": now + timedelta(seconds=ttl)}},
+        )
+        return result.matched_count > 0
+    except Exception as e:
+        print(f"작업 임대 연장 오류 ({name}): {e}")
+        return False
+
+
+def release_lease(name, next_run_in=0):
+    """임대를 반납하고 next_run_in 초 뒤부터 다시 실행할 수 있게 합니다."""
+    now = datetime.now(timezone.utc)
+    try:
+        get_db()[LEASE_COLLECTION].update_one(
+            {"_id": name, "owner": lease_owner()},
+            {"$set": {
+                "expires_at": now,
+                "next_run_at": now + timedelta(seconds=next_run_in),
+                "finished_at": now,
+            }},
+        )
+    except Exception as e:
+        print(f"작업 임대 반납 오류 ({name}): {e}")
+
+
+def get_lease(name):
+    """임대 상태를 반환합니다. (모니터링용)"""
+    doc = get_db()[LEASE_COLLECTION].find_one({"_id": name}, {"_id": 0})
+    if not doc:
+        return None
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in doc.items()
+    }
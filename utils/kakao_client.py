@@ -0,0 +1,203 @@
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from config import get_config
+
+cfg = get_config()
+
+KAKAO_AUTH_HOST = "https://kauth.kakao.com"
+KAKAO_API_HOST = "https://kapi.kakao.com"
+
+
+class KakaoUnavailableError(Exception):
+    """카카오 API가 응답하지 않거나 서킷이 열려 있을 때 발생합니다."""
+
+
+class CircuitBreaker:
+    """연속 실패가 쌓이면 일정 시간 동안 요청을 즉시 실패시킵니다."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_timeout:
+                    self.rejected += 1
+                    return False
+                # 대기 시간이 지나면 요청 하나만 시험 삼아 보낸다
+                self.state = self.HALF_OPEN
+                return True
+
+            # HALF_OPEN: 시험 요청이 끝날 때까지 나머지는 거절
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if (self.state == self.HALF_OPEN
+                    or self.failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "rejected": self.rejected,
+            }
+
+
+breaker = CircuitBreaker(
+    cfg.KAKAO_BREAKER_FAILURE_THRESHOLD,
+    cfg.KAKAO_BREAKER_RESET_TIMEOUT,
+)
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _create_session():
+    session = requests.Session()
+    # kauth / kapi 두 호스트에 대해 keep-alive 커넥션을 재사용
+    adapter = HTTPAdapter(
+        pool_connections=2,
+        pool_maxsize=cfg.KAKAO_POOL_MAXSIZE,
+        max_retries=0,
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session():
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _create_session()
+    return _session
+
+
+def reset_session():
+    """fork 이후 부모 프로세스의 커넥션을 공유하지 않도록 세션을 버립니다."""
+    global _session, _session_lock
+
+    _session_lock = threading.Lock()
+    _session = None
+
+
+def _backoff(attempt):
+    # 지수 백오프 + full jitter
+    return random.uniform(0, cfg.KAKAO_RETRY_BACKOFF * (2 ** attempt))
+
+
+def _request(method, url, idempotent=True, **kwargs):
+    """타임아웃/재시도/서킷 브레이커를 적용해서 카카오 API를 호출합니다."""
+    if not breaker.allow_request():
+        raise KakaoUnavailableError("카카오 API 서킷이 열려 있습니다.")
+
+    kwargs.setdefault(
+        "timeout", (cfg.KAKAO_CONNECT_TIMEOUT, cfg.KAKAO_READ_TIMEOUT)
+    )
+
+    last_error = None
+    for attempt in range(cfg.KAKAO_MAX_RETRIES + 1):
+        try:
+            response = get_session().request(method, url, **kwargs)
+        except requests.ConnectTimeout as e:
+            # 요청을 보내기 전에 실패했으므로 POST도 재시도해도 안전하다
+            last_error = e
+            retryable = True
+        except requests.RequestException as e:
+            # 읽기 타임아웃/연결 끊김은 요청이 처리됐을 수 있다
+            last_error = e
+            retryable = idempotent
+        else:
+            if response.status_code < 500:
+                # 4xx는 카카오가 정상 응답한 것 (토큰 만료 등)
+                breaker.record_success()
+                return response
+            last_error = KakaoUnavailableError(
+                f"카카오 API 서버 오류: {response.status_code}"
+            )
+            retryable = idempotent
+
+        if not retryable or attempt == cfg.KAKAO_MAX_RETRIES:
+            break
+        time.sleep(_backoff(attempt))
+
+    breaker.record_failure()
+    raise KakaoUnavailableError(str(last_error))
+
+
+def get_access_token_info(access_token):
+    """액세스 토큰 정보를 조회합니다. (유효하지 않으면 None)"""
+    response = _request(
+        "GET",
+        f"{KAKAO_API_HOST}/v1/user/access_token_info",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    if response.status_code != 200:
+        return None
+    return response.json()
+
+
+def get_user_me(access_token):
+    """액세스 토큰으로 카카오 사용자 정보를 조회합니다."""
+    response = _request(
+        "GET",
+        f"{KAKAO_API_HOST}/v2/user/me",
+        headers={"Authorization": f"Bearer {access_token}"},
+    )
+    return response.json()
+
+
+def request_token(token_data):
+    """카카오 토큰 발급/갱신 API를 호출합니다."""
+    response = _request(
+        "POST",
+        f"{KAKAO_AUTH_HOST}/oauth/token",
+        idempotent=False,
+        data=token_data,
+    )
+    return response.json()
+
+
+def get_client_stats():
+    stats = breaker.stats()
+    stats.update({
+        "pool_maxsize": cfg.KAKAO_POOL_MAXSIZE,
+        "connect_timeout": cfg.KAKAO_CONNECT_TIMEOUT,
+        "read_timeout": cfg.KAKAO_READ_TIMEOUT,
+        "max_retries": cfg.KAKAO_MAX_RETRIES,
+    })
+    return stats
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_session)
@@ -1,40 +1,170 @@
 from db import get_db
+from config import get_config
 from bson import ObjectId
+from bson.errors import InvalidId
 from datetime import datetime, timezone
+from pymongo import ReturnDocument, UpdateOne
 from utils.send_mail import send_notification_email
+from utils.realtime import emit_to_user
 
+cfg = get_config()
 
-def get_user_notifications(user_id):
-    """사용자의 모든 알림을 가져옵니다."""
+RECONCILE_BATCH_SIZE = 500
+
+# 알림 드롭다운에서 표시하는 필드
+NOTIFICATION_FIELDS = {"message": 1, "type": 1, "read": 1, "created_at": 1}
+
+
+def get_user_notifications(user_id, limit=None, before=None):
+    """사용자의 알림을 최신순으로 한 페이지 가져옵니다.
+
+    before(알림 _id) 보다 오래된 알림을 limit개 반환하고,
+    다음 페이지가 있으면 (notifications, next_cursor) 의 next_cursor에 커서를 담는다.
+    """
+    limit = limit or cfg.NOTIFICATION_PAGE_SIZE
     try:
         db = get_db()
+        query = {"user_id": user_id}
+        if before:
+            query["_id"] = {"$lt": ObjectId(before)}
+
+        # 다음 페이지 존재 여부를 알기 위해 하나 더 조회
         notifications = list(db.notification.find(
-            {"user_id": user_id}
-        ).sort("_id", -1))  # 최신순으로 정렬
+            query, NOTIFICATION_FIELDS
+        ).sort("_id", -1).limit(limit + 1))  # 최신순으로 정렬
+
+        next_cursor = None
+        if len(notifications) > limit:
+            notifications = notifications[:limit]
+            next_cursor = str(notifications[-1]["_id"])
 
-        return notifications
+        return notifications, next_cursor
 
+    except (InvalidId, TypeError):
+        return [], None
     except Exception as e:
         print(f"알림 조회 오류: {e}")
-        return []
+        return [], None
 
 
 def get_unread_notification_count(user_id):
-    """사용자의 읽지 않은 알림 개수를 반환합니다."""
+    """사용자의 읽지 않은 알림 개수를 반환합니다.
+
+    사용자 문서의 unread_count 를 읽는다. (필드가 없는 기존 사용자만 한 번 계산해서 저장)
+    """
     try:
         db = get_db()
-        count = db.notification.count_documents({
-            "user_id": user_id,
-            "read": False
-        })
+        user = db.user.find_one({"id": user_id}, {"unread_count": 1})
+        if not user:
+            return 0
+
+        if "unread_count" not in user:
+            count = db.notification.count_documents({
+                "user_id": user_id,
+                "read": False
+            })
+            db.user.update_one(
+                {"id": user_id, "unread_count": {"$exists": False}},
+                {"$set": {"unread_count": count}}
+            )
+            return count
 
-        return count
+        return max(user["unread_count"], 0)
 
     except Exception as e:
         print(f"읽지 않은 알림 개수 조회 오류: {e}")
         return 0
 
 
+def increment_unread_count(user_id, delta):
+    """사용자의 읽지 않은 알림 개수를 delta 만큼 바꾸고 바뀐 값을 반환합니다."""
+    try:
+        user = get_db().user.find_one_and_update(
+            # 필드가 없는 기존 사용자는 get_unread_notification_count 에서 계산
+            {"id": user_id, "unread_count": {"$exists": True}},
+            {"$inc": {"unread_count": delta}},
+            projection={"_id": 0, "unread_count": 1},
+            return_document=ReturnDocument.AFTER,
+        )
+        if user is None:
+            return get_unread_notification_count(user_id)
+        return max(user["unread_count"], 0)
+
+    except Exception as e:
+        print(f"읽지 않은 알림 개수 갱신 오류: {e}")
+        return None
+
+
+def reconcile_unread_counts(db=None):
+    """모든 사용자의 unread_count 를 실제 읽지 않은 알림 수로 맞춥니다.
+
+    어긋난 사용자 수를 반환한다.
+    """
+    db = db if db is not None else get_db()
+    # 집계보다 먼저 카운터를 읽어 둔다. 집계 중에 알림이 생기거나 읽히면
+    # 카운터도 바뀌므로 아래 비교-후-수정(CAS)이 실패해서 덮어쓰지 않는다
+    counters = {
+        user["id"]: user.get("unread_count")
+        for user in db.user.find({}, {"_id": 0, "id": 1, "unread_count": 1})
+    }
+    actual = {
+        item["_id"]: item["count"]
+        for item in db.notification.aggregate([
+            {"$match": {"read": False}},
+            {"$group": {"_id": "$user_id", "count": {"$sum": 1}}},
+        ])
+    }
+
+    fixed = 0
+    batch = []
+    for user_id, unread_count in counters.items():
+        count = actual.get(user_id, 0)
+        if unread_count == count:
+            continue
+        # 집계 전에 읽은 값이 그대로일 때만 수정
+        batch.append(UpdateOne(
+            {"id": user_id, "unread_count": unread_count},
+            {"$set": {"unread_count": count}},
+        ))
+        if len(batch) >= RECONCILE_BATCH_SIZE:
+            fixed += db.user.bulk_write(batch, ordered=False).modified_count
+            batch = []
+
+    if batch:
+        fixed += db.user.bulk_write(batch, ordered=False).modified_count
+
+    return fixed
+
+
+def serialize_notification(notification):
+    """알림을 JSON으로 보낼 수 있는 형태로 변환합니다."""
+    created_at = notification.get("created_at")
+    return {
+        "_id": str(notification["_id"]),
+        "message": notification.get("message", ""),
+        "type": notification.get("type", "general"),
+        "read": notification.get("read", False),
+        "created_at": created_at.isoformat() if created_at else None,
+    }
+
+
+def push_unread_count(user_id, count=None):
+    """사용자의 소켓으로 현재 읽지 않은 알림 개수를 보냅니다."""
+    if count is None:
+        count = get_unread_notification_count(user_id)
+    emit_to_user(user_id, "unread_count", {"count": count})
+
+
+def push_notification(user_id, notification, unread_count=None):
+    """새 알림과 읽지 않은 알림 개수를 사용자의 소켓으로 보냅니다."""
+    if unread_count is None:
+        unread_count = get_unread_notification_count(user_id)
+    emit_to_user(user_id, "notification", {
+        "notification": serialize_notification(notification),
+        "unread_count": unread_count,
+    })
+
+
 def mark_notification_as_read(notification_id, user_id):
     """특정 알림을 읽음 상태로 변경합니다."""
     try:
@@ -47,7 +177,8 @@ def mark_notification_as_read(notification_id, user_id):
         result = db.notification.update_one(
             {
                 "_id": notification_id,
-                "user_id": user_id  # 보안: 해당 사용자의 알림만 수정 가능
+                "user_id": user_id,  # 보안: 해당 사용자의 알림만 수정 가능
+                "read": False  # 이미 읽은 알림은 개수를 다시 줄이지 않도록
             },
             {
                 "$set": {
@@ -57,13 +188,54 @@ def mark_notification_as_read(notification_id, user_id):
             }
         )
 
-        return result.modified_count > 0
+        if result.modified_count > 0:
+            increment_unread_count(user_id, -1)
+            return True
+        return False
 
     except Exception as e:
         print(f"알림 읽음 처리 오류: {e}")
         return False
 
 
+def mark_notifications_as_read(user_id, notification_ids=None, up_to=None):
+    """여러 알림을 한 번의 update_many로 읽음 처리합니다.
+
+    notification_ids 목록 또는 up_to(이 _id 이하의 모든 알림) 중 하나로 대상을 정한다.
+    읽음 처리된 개수를 반환하고, 잘못된 ID면 None을 반환한다.
+    """
+    try:
+        query = {"user_id": user_id, "read": False}
+        if notification_ids:
+            query["_id"] = {"$in": [ObjectId(i) for i in notification_ids]}
+        elif up_to:
+            query["_id"] = {"$lte": ObjectId(up_to)}
+        else:
+            return 0
+    except (InvalidId, TypeError):
+        return None
+
+    try:
+        db = get_db()
+        result = db.notification.update_many(
+            query,
+            {
+                "$set": {
+                    "read": True,
+                    "read_at": datetime.now(timezone.utc)
+                }
+            }
+        )
+
+        if result.modified_count > 0:
+            increment_unread_count(user_id, -result.modified_count)
+        return result.modified_count
+
+    except Exception as e:
+        print(f"알림 일괄 읽음 처리 오류: {e}")
+        return 0
+
+
 def mark_all_notifications_as_read(user_id):
     """사용자의 모든 알림을 읽음 상태로 변경합니다."""
     try:
@@ -82,6 +254,8 @@ def mark_all_notifications_as_read(user_id):
             }
         )
 
+        if result.modified_count > 0:
+            increment_unread_count(user_id, -result.modified_count)
         return result.modified_count
 
     except Exception as e:
@@ -108,6 +282,11 @@ def create_notification(user_id, message, notification_type="general",
         # 알림을 데이터베이스에 저장
         result = db.notification.insert_one(notification)
 
+        # 읽지 않은 알림 개수 증가 후 접속 중인 사용자에게 바로 전달
+        if result.inserted_id:
+            unread_count = increment_unread_count(user_id, 1)
+            push_notification(user_id, notification, unread_count)
+
         # 이메일 발송 (옵션)
         if send_email and result.inserted_id:
             try:
@@ -140,12 +319,20 @@ def delete_notification(notification_id, user_id):
         if isinstance(notification_id, str):
             notification_id = ObjectId(notification_id)
 
-        result = db.notification.delete_one({
-            "_id": notification_id,
-            "user_id": user_id  # 보안: 해당 사용자의 알림만 삭제 가능
-        })
+        deleted = db.notification.find_one_and_delete(
+            {
+                "_id": notification_id,
+                "user_id": user_id  # 보안: 해당 사용자의 알림만 삭제 가능
+            },
+            projection={"read": 1},
+        )
+        if not deleted:
+            return False
 
-        return result.deleted_count > 0
+        # 읽지 않은 알림을 지웠으면 개수도 감소
+        if not deleted.get("read", False):
+            increment_unread_count(user_id, -1)
+        return True
 
     except Exception as e:
         print(f"알림 삭제 오류: {e}")
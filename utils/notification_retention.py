@@ -0,0 +1,248 @@
+import threading
+import time
+from datetime import datetime, timezone
+
+from pymongo.errors import OperationFailure
+from config import get_config
+from db import get_db
+from utils.indexes import NOTIFICATION_TTL_INDEX
+from utils.job_lease import (
+    acquire_lease,
+    get_lease,
+    release_lease,
+    renew_lease,
+)
+from utils.notification import increment_unread_count
+
+cfg = get_config()
+
+COMPACTION_LEASE = "notification_compaction"
+
+_stats_lock = threading.Lock()
+_stats = {
+    "runs": 0,
+    "running": False,
+    "last_started_at": None,
+    "last_finished_at": None,
+    "last_duration_ms": None,
+    "last_users_compacted": 0,
+    "last_deleted": 0,
+    "last_error": None,
+    # 다른 프로세스가 정리 중이거나 이번 주기에 이미 정리해서 건너뛴 횟수
+    "skipped": 0,
+    "users_compacted": 0,
+    "deleted": 0,
+    "deleted_unread": 0,
+    "batches": 0,
+    # 진행 중인 정리의 현재 위치
+    "progress": {"users_total": 0, "users_done": 0},
+}
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def _update_stats(**values):
+    with _stats_lock:
+        _stats.update(values)
+
+
+def _add_stats(**values):
+    with _stats_lock:
+        for key, value in values.items():
+            _stats[key] += value
+
+
+def get_retention_stats():
+    """알림 보관 정책 설정과 정리 작업 진행/삭제 통계를 반환합니다."""
+    with _stats_lock:
+        stats = dict(_stats, progress=dict(_stats["progress"]))
+    stats.update({
+        "read_retention_days": cfg.NOTIFICATION_READ_RETENTION_DAYS,
+        "max_per_user": cfg.NOTIFICATION_MAX_PER_USER,
+        "batch_size": cfg.NOTIFICATION_COMPACTION_BATCH_SIZE,
+        "interval_seconds": cfg.NOTIFICATION_COMPACTION_INTERVAL,
+        "worker_running": _worker is not None and _worker.is_alive(),
+    })
+    try:
+        stats["lease"] = get_lease(COMPACTION_LEASE)
+    except Exception as e:
+        stats["lease"] = {"error": str(e)}
+    return stats
+
+
+def sync_ttl_index(db=None):
+    """TTL 인덱스의 보관 기간을 현재 설정 값으로 맞춥니다.
+
+    create_indexes 는 이미 있는 인덱스의 expireAfterSeconds 를 바꾸지 않으므로 collMod로 변경한다.
+    """
+    db = db if db is not None else get_db()
+    try:
+        db.command({
+            "collMod": "notification",
+            "index": {
+                "name": NOTIFICATION_TTL_INDEX,
+                "expireAfterSeconds":
+                    cfg.NOTIFICATION_READ_RETENTION_DAYS * 86400,
+            },
+        })
+        return True
+    except OperationFailure as e:
+        print(f"알림 TTL 인덱스 변경 오류: {e}")
+        return False
+
+
+def _users_over_cap(db, max_per_user):
+    return [
+        item["_id"] for item in db.notification.aggregate([
+            {"$group": {"_id": "$user_id", "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": max_per_user}}},
+        ], allowDiskUse=True)
+    ]
+
+
+def _compact_user(db, user_id, max_per_user, batch_size):
+    """사용자의 알림 중 최신 max_per_user 개를 제외한 나머지를 배치로 삭제합니다."""
+    # 남길 알림 중 가장 오래된 것 바로 다음(더 오래된) 알림이 삭제 기준
+    boundary = list(db.notification.find(
+        {"user_id": user_id}, {"_id": 1}
+    ).sort("_id", -1).skip(max_per_user).limit(1))
+    if not boundary:
+        return 0
+
+    deleted = 0
+    while True:
+        batch = list(db.notification.find(
+            {"user_id": user_id, "_id": {"$lte": boundary[0]["_id"]}},
+            {"_id": 1, "read": 1},
+        ).sort("_id", 1).limit(batch_size))
+        if not batch:
+            break
+
+        unread_ids = [n["_id"] for n in batch if not n.get("read", False)]
+        read_ids = [n["_id"] for n in batch if n.get("read", False)]
+
+        # 조회 후 읽음 상태가 바뀐 알림은 이번에는 건너뛰어 unread_count가 어긋나지 않게 한다
+        unread_deleted = 0
+        if unread_ids:
+            unread_deleted = db.notification.delete_many(
+                {"_id": {"$in": unread_ids}, "read": False}
+            ).deleted_count
+        read_deleted = 0
+        if read_ids:
+            read_deleted = db.notification.delete_many(
+                {"_id": {"$in": read_ids}, "read": True}
+            ).deleted_count
+
+        if unread_deleted:
+            increment_unread_count(user_id, -unread_deleted)
+
+        deleted += unread_deleted + read_deleted
+        _add_stats(
+            deleted=unread_deleted + read_deleted,
+            deleted_unread=unread_deleted,
+            batches=1,
+        )
+
+        if len(batch) < batch_size:
+            break
+
+    return deleted
+
+
+def compact_notifications(db=None, max_per_user=None, batch_size=None,
+                          force=False):
+    """사용자별 보관 개수를 넘는 오래된 알림을 정리하고 삭제한 개수를 반환합니다.
+
+    여러 프로세스 중 임대(lease)를 얻은 하나만 실행하며, 얻지 못하면 None을 반환한다.
+    force 이면 이번 주기에 이미 정리했더라도 (실행 중인 곳이 없으면) 다시 정리한다.
+    """
+    db = db if db is not None else get_db()
+    max_per_user = max_per_user or cfg.NOTIFICATION_MAX_PER_USER
+    batch_size = batch_size or cfg.NOTIFICATION_COMPACTION_BATCH_SIZE
+    lease_ttl = cfg.NOTIFICATION_COMPACTION_LEASE_TTL
+
+    with _stats_lock:
+        if _stats["running"]:
+            _stats["skipped"] += 1
+            return None
+        _stats["running"] = True
+
+    if not acquire_lease(COMPACTION_LEASE, lease_ttl, force=force):
+        _add_stats(skipped=1)
+        _update_stats(running=False)
+        return None
+
+    started = time.monotonic()
+    _update_stats(
+        last_started_at=datetime.now(timezone.utc).isoformat(),
+        last_error=None,
+    )
+
+    deleted = 0
+    user_ids = []
+    try:
+        user_ids = _users_over_cap(db, max_per_user)
+        _update_stats(progress={"users_total": len(user_ids), "users_done": 0})
+
+        for done, user_id in enumerate(user_ids, start=1):
+            deleted += _compact_user(db, user_id, max_per_user, batch_size)
+            _update_stats(progress={
+                "users_total": len(user_ids), "users_done": done
+            })
+            # 임대를 잃었으면(만료 후 다른 프로세스가 가져감) 여기서 중단
+            if not renew_lease(COMPACTION_LEASE, lease_ttl):
+                raise RuntimeError("정리 작업 임대를 잃었습니다.")
+    except Exception as e:
+        print(f"알림 정리 오류: {e}")
+        _update_stats(last_error=str(e))
+    finally:
+        # 다음 주기 전까지는 다른 프로세스도 정리하지 않는다
+        release_lease(
+            COMPACTION_LEASE,
+            next_run_in=max(cfg.NOTIFICATION_COMPACTION_INTERVAL, 0),
+        )
+        _add_stats(runs=1, users_compacted=len(user_ids))
+        _update_stats(
+            running=False,
+            last_finished_at=datetime.now(timezone.utc).isoformat(),
+            last_duration_ms=round((time.monotonic() - started) * 1000, 1),
+            last_users_compacted=len(user_ids),
+            last_deleted=deleted,
+        )
+
+    return deleted
+
+
+def _run_worker(interval):
+    while True:
+        time.sleep(interval)
+        compact_notifications()
+
+
+def start_compaction_worker():
+    """주기적으로 알림을 정리하는 백그라운드 스레드를 시작합니다. (프로세스당 하나)
+
+    모든 프로세스에서 스레드가 돌지만 임대를 얻은 하나만 주기마다 정리한다.
+    """
+    global _worker
+
+    interval = cfg.NOTIFICATION_COMPACTION_INTERVAL
+    if interval <= 0:
+        return None
+
+    # 이미 실행 중이면 락 없이 바로 반환 (매 요청마다 호출됨)
+    worker = _worker
+    if worker is not None and worker.is_alive():
+        return worker
+
+    with _worker_lock:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(
+                target=_run_worker,
+                args=(interval,),
+                name="notification-compaction",
+                daemon=True,
+            )
+            _worker.start()
+        return _worker
@@ -0,0 +1,25 @@
+from flask_socketio import SocketIO
+
+# 화상 채팅 방과 사용자별 알림 채널이 함께 쓰는 Socket.IO 서버
+# (app.py 에서 init_app 으로 앱에 연결)
+socketio = SocketIO()
+
+# 사용자별 알림 채널은 화상 채팅(기본 네임스페이스)과 분리
+NOTIFICATION_NAMESPACE = "/notifications"
+
+
+def user_room(user_id):
+    """사용자의 모든 소켓 연결이 참여하는 개인 채널 이름"""
+    return f"user:{user_id}"
+
+
+def emit_to_user(user_id, event, data):
+    """사용자의 연결된 모든 소켓으로 이벤트를 보냅니다."""
+    try:
+        socketio.emit(
+            event, data, to=user_room(user_id),
+            namespace=NOTIFICATION_NAMESPACE,
+        )
+    except Exception as e:
+        # 소켓 서버가 없거나(CLI 등) 전송에 실패해도 알림 저장은 유지
+        print(f"소켓 이벤트 전송 오류 ({event}): {e}")
@@ -0,0 +1,131 @@
+import hashlib
+import jwt
+from datetime import datetime, timedelta, timezone
+from config import get_config
+from db import get_db
+from utils.cache import LRUTTLCache
+
+cfg = get_config()
+
+SESSION_COOKIE_NAME = "session_token"
+SESSION_ALGORITHM = "HS256"
+
+
+def _key_id(key):
+    # 키 원문 대신 해시 앞부분을 JWT 헤더의 kid로 사용
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:8]
+
+
+# kid -> 서명 키 (현재 키 + 교체 전 이전 키들)
+_verify_keys = {
+    _key_id(key): key
+    for key in [cfg.SESSION_SECRET_KEY, *cfg.SESSION_PREVIOUS_SECRET_KEYS]
+    if key
+}
+
+SESSION_TOKENS_ENABLED = bool(cfg.SESSION_SECRET_KEY)
+if not SESSION_TOKENS_ENABLED:
+    print("SESSION_SECRET_KEY가 설정되지 않아 세션 토큰을 사용하지 않습니다.")
+
+# 사용자 ID -> 세션 버전 (로그아웃 시 증가시켜 기존 토큰 무효화)
+session_version_cache = LRUTTLCache(
+    max_size=cfg.TOKEN_CACHE_MAX_SIZE,
+    default_ttl=cfg.SESSION_VERSION_CACHE_TTL,
+)
+
+
+def get_session_version(user_id):
+    """사용자의 현재 세션 버전을 반환합니다. (캐시 우선, 없는 사용자는 None)"""
+    version = session_version_cache.get(user_id)
+    if version is None:
+        user = get_db().user.find_one({"id": user_id}, {"session_version": 1})
+        if not user:
+            return None
+        version = user.get("session_version", 0)
+        session_version_cache.set(user_id, version)
+    return version
+
+
+def revoke_user_sessions(user_id):
+    """사용자에게 발급된 모든 세션 토큰을 무효화합니다."""
+    if not user_id:
+        return
+    try:
+        get_db().user.update_one(
+            {"id": str(user_id)}, {"$inc": {"session_version": 1}}
+        )
+    except Exception as e:
+        print(f"세션 무효화 오류: {e}")
+    session_version_cache.delete(str(user_id))
+
+
+def issue_session_token(user_id):
+    """내부 사용자 ID를 담은 짧은 수명의 세션 토큰을 발급합니다."""
+    if not SESSION_TOKENS_ENABLED:
+        return None
+
+    user_id = str(user_id)
+    version = get_session_version(user_id)
+    if version is None:
+        return None
+
+    now = datetime.now(timezone.utc)
+    payload = {
+        "sub": user_id,
+        "sv": version,
+        "iat": now,
+        "exp": now + timedelta(seconds=cfg.SESSION_TOKEN_TTL),
+    }
+    return jwt.encode(
+        payload,
+        cfg.SESSION_SECRET_KEY,
+        algorithm=SESSION_ALGORITHM,
+        headers={"kid": _key_id(cfg.SESSION_SECRET_KEY)},
+    )
+
+
+def verify_session_token(token):
+    """세션 토큰을 로컬에서 검증하고 사용자 ID를 반환합니다. (실패시 None)"""
+    if not token or not SESSION_TOKENS_ENABLED:
+        return None
+
+    try:
+        key = _verify_keys.get(jwt.get_unverified_header(token).get("kid"))
+        if not key:
+            # 알 수 없는(폐기된) 키로 서명된 토큰
+            return None
+
+        payload = jwt.decode(
+            token,
+            key,
+            algorithms=[SESSION_ALGORITHM],
+            options={"require": ["sub", "exp", "sv"]},
+        )
+    except jwt.InvalidTokenError:
+        # 만료/위조된 토큰은 카카오 토큰으로 다시 인증
+        return None
+
+    # 로그아웃/탈퇴로 세션 버전이 바뀌었으면 무효
+    version = get_session_version(payload["sub"])
+    if version is None or payload["sv"] != version:
+        return None
+
+    return payload["sub"]
+
+
+def set_session_cookie(response, user_id):
+    token = issue_session_token(user_id)
+    if token:
+        response.set_cookie(
+            SESSION_COOKIE_NAME,
+            token,
+            max_age=cfg.SESSION_TOKEN_TTL,
+            httponly=True,
+            secure=False,
+        )
+    return response
+
+
+def clear_session_cookie(response):
+    response.set_cookie(SESSION_COOKIE_NAME, "", expires=0)
+    return response
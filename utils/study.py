@@ -1,60 +1,316 @@
+import hashlib
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
 from db import get_db
+from config import get_config
 from utils.video_chat import create_study_confirmation_notification
 from utils.notification import create_notification
-
-
-def get_studies_by_tab(user_id, tab, search_keyword=None, category=None, is_closed=None):
-    """탭에 따라 스터디 데이터를 조회합니다."""
+from utils.cache import LRUTTLCache
+from utils.background import submit_background
+from utils.user_study import (
+    USER_STUDY_COLLECTION,
+    add_user_study,
+    get_user_study_ids,
+    get_user_study_sets,
+    remove_user_study,
+)
+from utils.cache_version import bump_collection_version, get_collection_version
+from utils.study_search import (
+    build_search_query,
+    search_score_expr,
+)
+
+cfg = get_config()
+
+# 스터디 목록 카드에서 쓰는 필드 (참가자 배열 대신 카운터만)
+LIST_FIELDS = {
+    "_id": 1,
+    "id": 1,
+    "host_id": 1,
+    "name": 1,
+    "description": 1,
+    "subject": 1,
+    "max_participants": 1,
+    "is_closed": 1,
+    "study_date": 1,
+    "version": 1,
+    "applicant_count": 1,
+    "confirmed_count": 1,
+    "seats_remaining": 1,
+}
+
+# (스터디 ID, 스터디 버전, 조회자 역할, 탭) -> 렌더링된 상세 HTML
+study_fragment_cache = LRUTTLCache(
+    max_size=cfg.STUDY_FRAGMENT_CACHE_MAX_SIZE,
+    default_ttl=cfg.STUDY_FRAGMENT_CACHE_TTL,
+)
+
+# (study 컬렉션 버전, 정규화된 조회 조건) -> (studies, next_cursor)
+study_list_cache = LRUTTLCache(
+    max_size=cfg.STUDY_LIST_CACHE_MAX_SIZE,
+    default_ttl=cfg.STUDY_LIST_CACHE_TTL,
+)
+
+
+def get_studies_by_tab(user_id, tab, search_keyword=None, category=None,
+                       is_closed=None, before=None, limit=None):
+    """탭에 따라 스터디 데이터를 조회합니다.
+
+    _id 기준 커서 페이지네이션: before 보다 오래된 스터디를 limit개 반환하고,
+    다음 페이지가 있으면 (studies, next_cursor) 의 next_cursor에 커서를 담는다.
+    검색어가 있으면 (검색 점수, _id) 순으로 정렬하고 커서도 "점수:_id" 형식이다.
+
+    조회 결과는 study 컬렉션 버전 기준으로 캐시하고,
+    사용자별 지원 상태(application_status)만 user_study 로 매번 새로 계산한다.
+    """
+    limit = limit or cfg.STUDY_PAGE_SIZE
     try:
-        db = get_db()
-        query = {}
-
-        if tab == "all":
-            # 전체 스터디
-            query = {}
-        elif tab == "my":
-            # 나의 스터디 (host_id가 현재 사용자)
-            query = {"host_id": user_id}
-        elif tab == "applied":
-            # 지원한 스터디
-            # (confirmed_candidate, candidate의 user_id에 포함)
-            query = {
-                "$or": [
-                    {"confirmed_candidate": user_id},
-                    {"candidate.user_id": user_id},
-                ]
-            }
+        # 전체 탭은 사용자와 무관하므로 모든 사용자가 같은 캐시를 공유
+        cache_key = (
+            get_collection_version("study"),
+            tab,
+            user_id if tab in ("my", "applied") else None,
+            (search_keyword or "").strip().lower(),
+            category or None,
+            str_to_bool(is_closed) if is_closed else None,
+            before or None,
+            limit,
+        )
+        cached = study_list_cache.get(cache_key)
+        if cached is None:
+            cached = _query_studies(
+                user_id, tab, search_keyword, category, is_closed,
+                before, limit
+            )
+            study_list_cache.set(cache_key, cached)
 
-        if search_keyword:
-            # 예: name, description 필드에서 검색
-            query["$or"] = query.get("$or", []) + [
-                {"name": {"$regex": search_keyword, "$options": "i"}},
-                {"description": {"$regex": search_keyword, "$options": "i"}},
-            ]
-            
-        if category:
-            query["subject"] = category
+        studies, next_cursor = cached
+        # 지원 상태는 사용자별 지원 스터디 목록(user_study) 한 번 조회로 계산
+        applied_ids, confirmed_ids = get_user_study_sets(user_id)
+        return [
+            _with_application_status(study, applied_ids, confirmed_ids)
+            for study in studies
+        ], next_cursor
 
-        if is_closed:
-            query["is_closed"] = str_to_bool(is_closed)
+    except Exception as e:
+        print(f"스터디 조회 오류: {e}")
+        return [], None
 
-        studies = list(db.study.find(query).sort("_id", -1))
 
-        # 각 스터디에 대한 지원 상태 정보 추가
-        for study in studies:
-            study['application_status'] = get_application_status(study, user_id)
+def get_study_facets():
+    """카테고리(subject)별 모집중/마감 스터디 수를 반환합니다.
 
-        return studies
+    한 번의 $facet 집계로 계산하고 study 컬렉션 버전 기준으로 캐시한다.
+    {"open": {subject: 수}, "closed": {subject: 수}, "total": {"open": 수, "closed": 수}}
+    """
+    try:
+        cache_key = ("facets", get_collection_version("study"))
+        facets = study_list_cache.get(cache_key)
+        if facets is None:
+            facets = _query_study_facets()
+            study_list_cache.set(cache_key, facets)
+        return facets
 
     except Exception as e:
-        print(f"스터디 조회 오류: {e}")
-        return []
+        print(f"스터디 카테고리 집계 오류: {e}")
+        return {"open": {}, "closed": {}, "total": {"open": 0, "closed": 0}}
+
+
+def _query_study_facets():
+    group_by_subject = {"$group": {"_id": "$subject", "count": {"$sum": 1}}}
+    result = next(get_db().study.aggregate([
+        {"$project": {"_id": 0, "subject": 1, "is_closed": 1}},
+        {"$facet": {
+            "open": [{"$match": {"is_closed": {"$ne": True}}}, group_by_subject],
+            "closed": [{"$match": {"is_closed": True}}, group_by_subject],
+        }},
+    ]))
+
+    facets = {"total": {}}
+    for status in ("open", "closed"):
+        counts = {
+            item["_id"]: item["count"]
+            for item in result.get(status, []) if item["_id"]
+        }
+        facets[status] = counts
+        facets["total"][status] = sum(counts.values())
+    return facets
+
+
+def _query_studies(user_id, tab, search_keyword, category, is_closed,
+                   before, limit):
+    db = get_db()
+    # 조건들은 $and로 묶는다 (탭의 $or와 검색 조건이 섞이지 않도록)
+    conditions = []
+
+    if tab == "my":
+        # 나의 스터디 (host_id가 현재 사용자)
+        conditions.append({"host_id": user_id})
+    elif tab == "applied":
+        # 지원한 스터디 (지원/확정 시 user_study 에 기록해 둔 _id 목록)
+        conditions.append({"_id": {"$in": get_user_study_ids(user_id)}})
+
+    search_tokens = []
+    if search_keyword:
+        # name, description의 n-gram 토큰 검색
+        search_query, search_tokens = build_search_query(search_keyword)
+        if search_query is None:
+            return [], None
+        conditions.append(search_query)
+
+    if category:
+        conditions.append({"subject": category})
+
+    if is_closed:
+        conditions.append({"is_closed": str_to_bool(is_closed)})
+
+    pipeline = []
+    if conditions:
+        pipeline.append({"$match": {"$and": conditions}})
+
+    if search_tokens:
+        pipeline.append({
+            "$addFields": {"search_score": search_score_expr(search_tokens)}
+        })
+        sort = {"search_score": -1, "_id": -1}
+    else:
+        sort = {"_id": -1}
+
+    if before:
+        cursor_match = _cursor_match(before, bool(search_tokens))
+        if cursor_match is None:
+            return [], None
+        pipeline.append({"$match": cursor_match})
+
+    # 다음 페이지 존재 여부를 알기 위해 하나 더 조회
+    projection = dict(LIST_FIELDS)
+    if search_tokens:
+        projection["search_score"] = 1
+    pipeline += [
+        {"$sort": sort},
+        {"$limit": limit + 1},
+        {"$project": projection},
+    ]
+    studies = list(db.study.aggregate(pipeline))
+
+    next_cursor = None
+    if len(studies) > limit:
+        studies = studies[:limit]
+        next_cursor = _encode_cursor(studies[-1], bool(search_tokens))
+
+    return studies, next_cursor
+
+
+def _with_application_status(study, applied_ids, confirmed_ids):
+    """캐시된 스터디를 복사해서 현재 사용자의 지원 상태를 덧붙입니다."""
+    result = dict(study)
+    if study["_id"] in confirmed_ids:
+        result["application_status"] = "confirmed"
+    elif study.get("is_closed", False):
+        result["application_status"] = "closed"
+    elif study["_id"] in applied_ids:
+        result["application_status"] = "pending"
+    else:
+        result["application_status"] = "not_applied"
+    return result
+
+
+def _encode_cursor(study, searching):
+    if searching:
+        return f"{study['search_score']}:{study['_id']}"
+    return str(study["_id"])
+
+
+def _cursor_match(before, searching):
+    """커서 이후(정렬 기준으로 뒤쪽) 문서만 고르는 조건 (잘못된 커서면 None)"""
+    try:
+        if not searching:
+            return {"_id": {"$lt": ObjectId(before)}}
+
+        score, last_id = before.split(":", 1)
+        score, last_id = int(score), ObjectId(last_id)
+        return {
+            "$or": [
+                {"search_score": {"$lt": score}},
+                {"search_score": score, "_id": {"$lt": last_id}},
+            ]
+        }
+    except (InvalidId, ValueError, TypeError):
+        return None
+
 
 def str_to_bool(value):
     if isinstance(value, str):
         return value.lower() in ('true', '1', 'yes', 'on')
     return bool(value)
 
+def get_viewer_role(study, user_id):
+    """상세 화면을 결정하는 조회자 역할 (호스트 / 지원 상태)"""
+    if study.get("host_id") == user_id:
+        return "host"
+    return get_application_status(study, user_id)
+
+
+def study_fragment_etag(study_id, version, user_id, tab):
+    """스터디 버전과 조회자 기준의 상세 조각 ETag
+
+    역할은 (스터디 버전, 사용자)로 결정되므로 ETag에 사용자 해시를 넣으면
+    DB를 읽지 않고도 같은 버전에 대한 재요청을 304로 응답할 수 있다.
+    """
+    raw = f"{study_id}:{version}:{user_id}:{tab}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def get_study_with_participants(study_id, viewer_id):
+    """스터디와 (조회자가 호스트인 경우) 참가자 사용자 정보를 한 번에 조회합니다.
+
+    확정 참가자와 지원자 ID를 $lookup 으로 user 컬렉션과 연결하고,
+    호스트 화면에서 쓰는 필드(id, name, interest_of_subject)만 남긴다.
+    호스트가 아니면 연결할 ID 목록을 비워서 사용자 정보는 읽지 않는다.
+    """
+    try:
+        db = get_db()
+        pipeline = [
+            {"$match": {"id": study_id}},
+            {"$limit": 1},
+            {"$addFields": {"participant_ids": {"$cond": [
+                {"$eq": ["$host_id", viewer_id]},
+                {"$setUnion": [
+                    {"$ifNull": ["$confirmed_candidate", []]},
+                    applicant_ids_expr(),
+                ]},
+                [],
+            ]}}},
+            {"$lookup": {
+                "from": "user",
+                "localField": "participant_ids",
+                "foreignField": "id",
+                "as": "participant_users",
+            }},
+            {"$addFields": {"participant_users": {"$map": {
+                "input": "$participant_users",
+                "as": "u",
+                "in": {
+                    "id": "$$u.id",
+                    "name": "$$u.name",
+                    "interest_of_subject": "$$u.interest_of_subject",
+                },
+            }}}},
+            {"$project": {
+                "participant_ids": 0,
+                "search_tokens": 0,
+                "name_tokens": 0,
+            }},
+        ]
+        studies = list(db.study.aggregate(pipeline))
+        return studies[0] if studies else None
+
+    except Exception as e:
+        print(f"스터디 상세 조회 오류: {e}")
+        return None
+
+
 def get_study_by_id(study_id):
     """스터디 ID로 특정 스터디를 조회합니다."""
     try:
@@ -68,38 +324,88 @@ def get_study_by_id(study_id):
 
 
 def apply_to_study(study_id, user_id, selected_dates):
-    """스터디에 참여 신청합니다."""
+    """스터디에 참여 신청합니다.
+
+    확인과 쓰기를 한 번의 find_one_and_update로 처리한다.
+    가드 조건(마감/확정/중복 신청/날짜)은 업데이트 파이프라인 안에서 평가해서
+    통과할 때만 선택한 날짜들에 사용자를 추가하고,
+    변경 전 문서의 가드 결과만 돌려받아 실패 사유를 추가 조회 없이 판단한다.
+    """
+    dates = list(dict.fromkeys(selected_dates or []))
+    if not dates:
+        return False, "참여하고 싶은 날짜를 선택해주세요."
+
     try:
         db = get_db()
+        guards = _apply_guard_exprs(user_id, dates)
+        can_apply = {"$and": [
+            {"$not": [guards["already_applied"]]},
+            {"$not": [guards["is_confirmed"]]},
+            {"$ne": ["$is_closed", True]},
+            guards["has_date"],
+        ]}
+
+        before = db.study.find_one_and_update(
+            {"id": study_id},
+            [{"$set": {
+                # 선택한 날짜의 candidate 원소에만 사용자 ID 추가 + 지원자 수 증가
+                "candidate": {"$cond": [
+                    can_apply,
+                    {"$map": {
+                        "input": "$candidate",
+                        "as": "c",
+                        "in": {"$cond": [
+                            {"$in": ["$$c.date", dates]},
+                            {"$mergeObjects": ["$$c", {
+                                "user_id": {"$concatArrays": [
+                                    {"$ifNull": ["$$c.user_id", []]},
+                                    [user_id],
+                                ]},
+                                # 날짜별 지원자 수 (count가 없던 문서는 배열 크기에서 시작)
+                                "count": {"$add": [
+                                    {"$ifNull": ["$$c.count", {"$size": {
+                                        "$ifNull": ["$$c.user_id", []]
+                                    }}]},
+                                    1,
+                                ]},
+                            }]},
+                            "$$c",
+                        ]},
+                    }},
+                    "$candidate",
+                ]},
+                "version": {"$cond": [
+                    can_apply,
+                    {"$add": [{"$ifNull": ["$version", 0]}, 1]},
+                    "$version",
+                ]},
+            }}, study_counters_stage()],
+            projection={
+                "is_closed": 1,
+                "already_applied": guards["already_applied"],
+                "is_confirmed": guards["is_confirmed"],
+                "has_date": guards["has_date"],
+            },
+            return_document=ReturnDocument.BEFORE,
+        )
 
-        # 스터디 존재 확인
-        study = db.study.find_one({"id": study_id})
-        if not study:
+        if before is None:
             return False, "스터디를 찾을 수 없습니다."
 
-        # 이미 신청했는지 확인
-        already_applied = any(
-            user_id in candidate.get("user_id", [])
-            for candidate in study.get("candidate", [])
-        )
-
-        if already_applied:
+        if before.get("already_applied"):
             return False, "이미 신청한 스터디입니다."
 
-        # 확정 참여자인지 확인
-        if user_id in study.get("confirmed_candidate", []):
+        if before.get("is_confirmed"):
             return False, "이미 확정된 참여자입니다."
 
-        # 마감된 스터디인지 확인
-        if study.get('is_closed'):
+        if before.get("is_closed"):
             return False, "스터디가 이미 마감되었습니다."
 
-        # 선택된 날짜들에 사용자 ID 추가
-        for selected_date in selected_dates:
-            db.study.update_one(
-                {"id": study_id, "candidate.date": selected_date},
-                {"$addToSet": {"candidate.$.user_id": user_id}},
-            )
+        if not before.get("has_date"):
+            return False, "선택한 날짜가 올바르지 않습니다."
+
+        add_user_study([user_id], before["_id"])
+        bump_collection_version("study")
 
         return True, "스터디 참여 신청이 완료되었습니다."
 
@@ -108,146 +414,212 @@ def apply_to_study(study_id, user_id, selected_dates):
         return False, "신청 처리 중 오류가 발생했습니다."
 
 
-def get_study_participants(study_id):
-    """스터디 참가자 정보를 조회합니다."""
+def _apply_guard_exprs(user_id, dates):
+    """참여 신청 가드 조건을 문서 기준으로 평가하는 식"""
+    return {
+        "already_applied": {"$in": [user_id, applicant_ids_expr()]},
+        "is_confirmed": {
+            "$in": [user_id, {"$ifNull": ["$confirmed_candidate", []]}]
+        },
+        "has_date": {"$anyElementTrue": [{"$map": {
+            "input": {"$ifNull": ["$candidate", []]},
+            "as": "c",
+            "in": {"$in": ["$$c.date", dates]},
+        }}]},
+    }
+
+
+def get_study_participants(study):
+    """조회된 스터디 문서에서 참가자 정보를 나눕니다.
+
+    사용자 정보는 get_study_with_participants 에서 함께 조회한
+    participant_users 를 사용하므로 DB를 다시 읽지 않는다.
+    (확정 참가자, 대기 중인 지원자, 날짜별 지원자) 를 반환한다.
+    """
+    users_by_id = {
+        user["id"]: user for user in study.get("participant_users", [])
+    }
+    confirmed_ids = study.get("confirmed_candidate", [])
+
+    # 확정된 참가자 정보
+    confirmed_participants = [
+        users_by_id[user_id] for user_id in confirmed_ids
+        if user_id in users_by_id
+    ]
+
+    # 대기 중인 지원자 정보 (confirmed에 없는 사람들) / 날짜별 지원자
+    pending_candidates = []
+    pending_seen = set()
+    candidates_by_date = []
+    for candidate in study.get("candidate", []):
+        date_users = []
+        for user_id in candidate.get("user_id", []):
+            user = users_by_id.get(user_id)
+            if not user:
+                continue
+            date_users.append(user)
+            if user_id not in confirmed_ids and user_id not in pending_seen:
+                pending_seen.add(user_id)
+                pending_candidates.append(user)
+        candidates_by_date.append({
+            "date": candidate.get("date"),
+            "users": date_users,
+        })
+
+    return confirmed_participants, pending_candidates, candidates_by_date
+
+
+def update_confirmed_candidates(study_id, confirmed_candidates, study_date=None,
+                                host_id=None, expected_version=None):
+    """스터디의 확정 참가자와 날짜를 업데이트합니다.
+
+    호스트가 본 화면의 스터디 버전(expected_version)과 마감 여부, 최대 참가자 수를
+    조건으로 한 번만 갱신되도록 해서 (compare-and-set)
+    동시에 여러 번 확정해도 한 요청만 성공하고 알림/화상채팅 생성도 한 번만 일어난다.
+    """
+    confirmed_candidates = list(dict.fromkeys(confirmed_candidates or []))
     try:
         db = get_db()
 
-        study = db.study.find_one({"id": study_id})
-        if not study:
-            return None, None
-
-        # 확정된 참가자 정보 조회
-        confirmed_participants = []
-        if study.get("confirmed_candidate"):
-            confirmed_users = list(db.user.find(
-                {"id": {"$in": study["confirmed_candidate"]}}
-            ))
-            confirmed_participants = confirmed_users
-
-        # 대기 중인 지원자 정보 조회 (confirmed에 없는 사람들)
-        pending_user_ids = set()
-        for candidate in study.get("candidate", []):
-            for user_id in candidate.get("user_id", []):
-                if user_id not in study.get("confirmed_candidate", []):
-                    pending_user_ids.add(user_id)
-
-        pending_candidates = []
-        if pending_user_ids:
-            pending_users = list(db.user.find(
-                {"id": {"$in": list(pending_user_ids)}}
-            ))
-            pending_candidates = pending_users
-
-        return confirmed_participants, pending_candidates
-
-    except Exception as e:
-        print(f"참가자 정보 조회 오류: {e}")
-        return [], []
-
-
-def update_confirmed_candidates(study_id, confirmed_candidates, study_date=None):
-    """스터디의 확정 참가자와 날짜를 업데이트합니다."""
-    try:
-        db = get_db()
-        
-        # 스터디 존재 확인
-        study = db.study.find_one({"id": study_id})
-        if not study:
-            return False, "스터디를 찾을 수 없습니다."
-
-        # 최대 참가자 수 확인
-        if len(confirmed_candidates) > study.get("max_participants", 0):
-            return False, "최대 참가자 수를 초과했습니다."
+        query = {
+            "id": study_id,
+            "is_closed": {"$ne": True},
+            "max_participants": {"$gte": len(confirmed_candidates)},
+        }
+        if host_id is not None:
+            query["host_id"] = host_id
+        if expected_version is not None:
+            # version 필드가 없는 기존 스터디는 0으로 본다
+            query["version"] = (
+                expected_version if expected_version
+                else {"$in": [0, None]}
+            )
 
-        # 업데이트할 데이터 준비
+        # 업데이트할 데이터 준비 (파이프라인에서는 값이 식으로 해석되지 않도록 $literal)
         update_data = {
-            "confirmed_candidate": confirmed_candidates,
-            "is_closed": True
+            "confirmed_candidate": {"$literal": confirmed_candidates},
+            "is_closed": True,
+            "version": {"$add": [{"$ifNull": ["$version", 0]}, 1]},
         }
 
         # 스터디 날짜가 제공된 경우 추가
         if study_date:
-            update_data["study_date"] = study_date
-
-        # 확정 참가자 및 스터디 날짜 업데이트
-        result = db.study.update_one(
-            {"id": study_id},
-            {"$set": update_data}
+            update_data["study_date"] = {"$literal": study_date}
+
+        # 확정 참가자 및 스터디 날짜 업데이트 (카드 카운터도 함께)
+        study = db.study.find_one_and_update(
+            query,
+            [{"$set": update_data}, study_counters_stage()],
+            projection={"name": 1, "study_date": 1, "host_id": 1},
+            return_document=ReturnDocument.BEFORE,
         )
 
-        if result.modified_count > 0:
-            # 확정된 사용자들에게 알림 및 이메일 발송
-            try:
-                study_name = study.get("name", "스터디")
-                final_date = study_date or study.get("study_date", "")
-
-                if confirmed_candidates and final_date:
-                    create_study_confirmation_notification(
-                        confirmed_candidates,
-                        study_name,
-                        final_date,
-                        study.get("host_id")
-                    )
-            except Exception as notification_error:
-                print(f"알림 발송 오류 (스터디 확정은 완료됨): {notification_error}")
-
-            return True, "참가자가 확정되었습니다."
-        else:
-            return False, "변경사항이 없습니다."
+        if study is None:
+            return False, _confirm_failure_reason(
+                db, study_id, confirmed_candidates, host_id, expected_version
+            )
+
+        add_user_study(confirmed_candidates, study["_id"], confirmed=True)
+        bump_collection_version("study")
+
+        # 확정된 사용자들에게 알림 및 이메일 발송 (확정에 성공한 요청에서만)
+        try:
+            study_name = study.get("name", "스터디")
+            final_date = study_date or study.get("study_date", "")
+
+            if confirmed_candidates and final_date:
+                create_study_confirmation_notification(
+                    confirmed_candidates,
+                    study_name,
+                    final_date,
+                    study.get("host_id")
+                )
+        except Exception as notification_error:
+            print(f"알림 발송 오류 (스터디 확정은 완료됨): {notification_error}")
+
+        return True, "참가자가 확정되었습니다."
 
     except Exception as e:
         print(f"참가자 확정 오류: {e}")
         return False, "확정 처리 중 오류가 발생했습니다."
 
 
+def _confirm_failure_reason(db, study_id, confirmed_candidates, host_id,
+                            expected_version):
+    """확정 조건에 맞지 않았던 이유를 찾습니다. (실패한 경우에만 조회)"""
+    study = db.study.find_one(
+        {"id": study_id},
+        {"host_id": 1, "is_closed": 1, "max_participants": 1, "version": 1},
+    )
+    if not study:
+        return "스터디를 찾을 수 없습니다."
+
+    if host_id is not None and study.get("host_id") != host_id:
+        return "스터디를 확정할 권한이 없습니다."
+
+    if study.get("is_closed"):
+        return "이미 확정된 스터디입니다."
+
+    if len(confirmed_candidates) > study.get("max_participants", 0):
+        return "최대 참가자 수를 초과했습니다."
+
+    if (expected_version is not None
+            and study.get("version", 0) != expected_version):
+        return "다른 곳에서 스터디가 변경되었습니다. 새로고침 후 다시 시도해주세요."
+
+    return "변경사항이 없습니다."
+
 
 def withdraw_from_study(study_id, user_id):
-    """스터디 지원을 철회합니다."""
+    """스터디 지원을 철회합니다.
+
+    확정 참가자/모든 날짜의 지원자 목록에서 한 번의 find_one_and_update로 제거하고
+    (날짜별 지원자 수와 카드 카운터도 함께 갱신), 호스트 알림은 백그라운드에서 만든다.
+    """
     try:
         db = get_db()
 
-        # 스터디 존재 확인
-        study = db.study.find_one({"id": study_id})
-        if not study:
-            return False, "스터디를 찾을 수 없습니다."
-
-        # 스터디가 이미 마감된 경우 철회 불가
-        if study.get('is_closed'):
-            return False, "이미 마감된 스터디에서는 철회할 수 없습니다."
-
-        # confirmed_candidate에서 제거
-        was_confirmed = user_id in study.get("confirmed_candidate", [])
-        if was_confirmed:
-            db.study.update_one(
-                {"id": study_id},
-                {"$pull": {"confirmed_candidate": user_id}}
-            )
-
-        # candidate에서 사용자 ID 제거
-        withdrawn = False
-        for candidate in study.get("candidate", []):
-            if user_id in candidate.get("user_id", []):
-                db.study.update_one(
-                    {"id": study_id, "candidate.date": candidate["date"]},
-                    {"$pull": {"candidate.$.user_id": user_id}}
-                )
-                withdrawn = True
+        before = db.study.find_one_and_update(
+            {
+                "id": study_id,
+                # 마감된 스터디는 철회 불가
+                "is_closed": {"$ne": True},
+                "$or": [
+                    {"confirmed_candidate": user_id},
+                    {"candidate.user_id": user_id},
+                ],
+            },
+            remove_user_pipeline(user_id),
+            projection={
+                "host_id": 1,
+                "name": 1,
+                "confirmed_candidate": {"$elemMatch": {"$eq": user_id}},
+            },
+            return_document=ReturnDocument.BEFORE,
+        )
 
-        if not withdrawn and not was_confirmed:
+        if before is None:
+            # 실패한 경우에만 사유 확인을 위해 다시 조회
+            study = db.study.find_one({"id": study_id}, {"is_closed": 1})
+            if not study:
+                return False, "스터디를 찾을 수 없습니다."
+            if study.get('is_closed'):
+                return False, "이미 마감된 스터디에서는 철회할 수 없습니다."
             return False, "지원하지 않은 스터디입니다."
 
-        # 호스트에게 알림 생성
-        host_id = study.get("host_id")
+        remove_user_study([user_id], before["_id"])
+        bump_collection_version("study")
+
+        # 호스트에게 알림 생성 (사용자 이름 조회/메일 발송은 응답 이후에)
+        host_id = before.get("host_id")
         if host_id:
-            # 사용자 정보 조회
-            user = db.user.find_one({"id": user_id})
-            user_name = user.get("name", "사용자") if user else "사용자"
-            
-            status_text = "확정 참가자" if was_confirmed else "지원자"
-            message = f"{user_name}님이 '{study.get('name', '스터디')}'에서 {status_text} 철회했습니다."
-            
-            create_notification(host_id, message)
+            submit_background(
+                _notify_host_of_withdrawal,
+                host_id,
+                user_id,
+                before.get("name", "스터디"),
+                bool(before.get("confirmed_candidate")),
+            )
 
         return True, "지원이 철회되었습니다."
 
@@ -256,6 +628,79 @@ def withdraw_from_study(study_id, user_id):
         return False, "철회 처리 중 오류가 발생했습니다."
 
 
+def get_date_recommendations(study_id, host_id):
+    """호스트에게 스터디 진행 날짜를 추천합니다.
+
+    날짜별 지원자 수(candidate[].count)만 읽어서 O(날짜 수)로 계산한다.
+    최대 참가자 수까지 채울 수 있는 인원이 많은 날짜 > 전체 지원자가 많은 날짜
+    > 빠른 날짜 순으로 정렬한다.
+    """
+    try:
+        db = get_db()
+        study = db.study.find_one(
+            {"id": study_id, "host_id": host_id},
+            {
+                "_id": 0,
+                "max_participants": 1,
+                "candidate.date": 1,
+                "candidate.count": 1,
+            },
+        )
+        if not study:
+            return False, "스터디를 찾을 수 없습니다."
+
+        max_participants = study.get("max_participants", 0)
+        dates = []
+        for candidate in study.get("candidate", []):
+            count = max(candidate.get("count", 0), 0)
+            dates.append({
+                "date": candidate.get("date"),
+                "count": count,
+                "fillable": min(count, max_participants),
+                "is_full": max_participants > 0 and count >= max_participants,
+            })
+
+        dates.sort(key=lambda d: (-d["fillable"], -d["count"], d["date"] or ""))
+
+        return True, {
+            "max_participants": max_participants,
+            "best_date": dates[0]["date"] if dates and dates[0]["count"] else None,
+            "dates": dates,
+        }
+
+    except Exception as e:
+        print(f"날짜 추천 오류: {e}")
+        return False, "날짜 추천 중 오류가 발생했습니다."
+
+
+def backfill_candidate_counts(only_missing=False, db=None):
+    """candidate[].count 를 user_id 배열 크기로 다시 계산합니다."""
+    db = db if db is not None else get_db()
+    query = (
+        {"candidate": {"$elemMatch": {"count": {"$exists": False}}}}
+        if only_missing else {}
+    )
+    result = db.study.update_many(query, [{"$set": {"candidate": {"$map": {
+        "input": {"$ifNull": ["$candidate", []]},
+        "as": "c",
+        "in": {"$mergeObjects": ["$$c", {
+            "count": {"$size": {"$ifNull": ["$$c.user_id", []]}}
+        }]},
+    }}}}])
+    return result.modified_count
+
+
+def _notify_host_of_withdrawal(host_id, user_id, study_name, was_confirmed):
+    """지원 철회 사실을 호스트에게 알립니다."""
+    user = get_db().user.find_one({"id": user_id}, {"name": 1})
+    user_name = user.get("name", "사용자") if user else "사용자"
+
+    status_text = "확정 참가자" if was_confirmed else "지원자"
+    message = f"{user_name}님이 '{study_name}'에서 {status_text} 철회했습니다."
+
+    create_notification(host_id, message)
+
+
 def delete_study(study_id, user_id):
     """스터디를 삭제합니다. (호스트만 가능)"""
     try:
@@ -278,6 +723,11 @@ def delete_study(study_id, user_id):
         result = db.study.delete_one({"id": study_id})
         
         if result.deleted_count > 0:
+            participants = set(study.get("confirmed_candidate", []))
+            for candidate in study.get("candidate", []):
+                participants.update(candidate.get("user_id", []))
+            remove_user_study(participants, study["_id"])
+            bump_collection_version("study")
             return True, "스터디가 삭제되었습니다."
         else:
             return False, "스터디 삭제에 실패했습니다."
@@ -287,9 +737,158 @@ def delete_study(study_id, user_id):
         return False, "삭제 처리 중 오류가 발생했습니다."
 
 
+def study_counters_stage():
+    """목록 카드용 카운터(지원자 수/확정 인원/남은 자리)를 다시 계산하는 파이프라인 단계
+
+    쓰기 파이프라인 마지막에 붙여서 같은 업데이트 안에서 원자적으로 갱신한다.
+    확정은 마감할 때만 정해지므로 모집 중 남은 자리는 지원자 수 기준으로 계산한다.
+    """
+    return {"$set": {
+        "applicant_count": {"$size": applicant_ids_expr()},
+        "confirmed_count": {
+            "$size": {"$ifNull": ["$confirmed_candidate", []]}
+        },
+        "seats_remaining": {"$max": [0, {"$subtract": [
+            {"$ifNull": ["$max_participants", 0]},
+            {"$size": applicant_ids_expr()},
+        ]}]},
+    }}
+
+
+def remove_user_pipeline(user_id):
+    """스터디에서 사용자를 확정 참가자/모든 날짜의 지원자 목록에서 빼는 업데이트 파이프라인"""
+    not_user = {"$ne": ["$$u", user_id]}
+    return [
+        {"$set": {
+            "candidate": {"$map": {
+                "input": {"$ifNull": ["$candidate", []]},
+                "as": "c",
+                "in": {"$cond": [
+                    {"$in": [user_id, {"$ifNull": ["$$c.user_id", []]}]},
+                    {"$mergeObjects": ["$$c", {
+                        "user_id": {"$filter": {
+                            "input": "$$c.user_id", "as": "u", "cond": not_user,
+                        }},
+                        # 사용자가 지원했던 날짜의 지원자 수 감소
+                        "count": {"$subtract": [
+                            {"$ifNull": ["$$c.count", {"$size": "$$c.user_id"}]},
+                            1,
+                        ]},
+                    }]},
+                    "$$c",
+                ]},
+            }},
+            "confirmed_candidate": {"$filter": {
+                "input": {"$ifNull": ["$confirmed_candidate", []]},
+                "as": "u",
+                "cond": not_user,
+            }},
+            "version": {"$add": [{"$ifNull": ["$version", 0]}, 1]},
+        }},
+        study_counters_stage(),
+    ]
+
+
+def backfill_study_counters(only_missing=False, db=None):
+    """목록 카드용 카운터를 다시 계산합니다."""
+    db = db if db is not None else get_db()
+    query = (
+        {"applicant_count": {"$exists": False}} if only_missing else {}
+    )
+    return db.study.update_many(query, [study_counters_stage()]).modified_count
+
+
+def applicant_ids_expr():
+    """candidate[].user_id 를 하나의 (중복 없는) 사용자 ID 배열로 합치는 식"""
+    return {
+        "$setUnion": [{
+            "$reduce": {
+                "input": {"$ifNull": ["$candidate", []]},
+                "initialValue": [],
+                "in": {"$concatArrays": [
+                    "$$value", {"$ifNull": ["$$this.user_id", []]}
+                ]},
+            }
+        }]
+    }
+
+
+def _user_study_pipeline():
+    """study 컬렉션에서 (사용자 -> 지원/확정 스터디 _id 목록) 을 계산하는 파이프라인"""
+    return [
+        {"$project": {
+            "user_ids": {"$setUnion": [
+                {"$ifNull": ["$confirmed_candidate", []]},
+                applicant_ids_expr(),
+            ]},
+            "confirmed": {"$ifNull": ["$confirmed_candidate", []]},
+        }},
+        {"$unwind": "$user_ids"},
+        {"$group": {
+            "_id": "$user_ids",
+            "study_ids": {"$addToSet": "$_id"},
+            "confirmed_ids": {"$addToSet": {"$cond": [
+                {"$in": ["$user_ids", "$confirmed"]}, "$_id", "$$REMOVE"
+            ]}},
+        }},
+    ]
+
+
+def rebuild_user_study_index(only_if_empty=False, db=None):
+    """user_study 컬렉션을 study 컬렉션 기준으로 다시 만듭니다.
+
+    only_if_empty 이면 아직 만들어지지 않은 경우에만 만든다. (기존 데이터 이전용)
+    $out 실행 중에 들어온 지원/철회는 반영되지 않으므로 트래픽이 없는
+    배포 단계(CLI)에서만 실행한다.
+    """
+    db = db if db is not None else get_db()
+    if only_if_empty and db[USER_STUDY_COLLECTION].find_one({}, {"_id": 1}):
+        return None
+    # $out 은 결과 컬렉션을 한 번에 교체한다
+    db.study.aggregate(
+        _user_study_pipeline() + [{"$out": USER_STUDY_COLLECTION}]
+    )
+    return db[USER_STUDY_COLLECTION].count_documents({})
+
+
+def check_user_study_index(db=None):
+    """user_study 컬렉션이 study 컬렉션과 일치하는지 확인합니다.
+
+    (일치 여부, 불일치 사용자 목록) 을 반환한다.
+    """
+    db = db if db is not None else get_db()
+    # 확정 스터디는 "c:" 를 붙여서 지원 스터디와 함께 비교
+    def _entries(doc):
+        return (
+            {str(oid) for oid in doc.get("study_ids", [])}
+            | {f"c:{oid}" for oid in doc.get("confirmed_ids", [])}
+        )
+
+    expected = {
+        doc["_id"]: _entries(doc)
+        for doc in db.study.aggregate(_user_study_pipeline())
+    }
+    actual = {
+        doc["_id"]: _entries(doc)
+        for doc in db[USER_STUDY_COLLECTION].find()
+    }
+
+    mismatches = []
+    for user_id in expected.keys() | actual.keys():
+        missing = expected.get(user_id, set()) - actual.get(user_id, set())
+        extra = actual.get(user_id, set()) - expected.get(user_id, set())
+        if missing or extra:
+            mismatches.append({
+                "user_id": user_id,
+                "missing": sorted(missing),
+                "extra": sorted(extra),
+            })
+
+    return not mismatches, mismatches
+
+
 def get_application_status(study, user_id):
     """스터디에 대한 사용자의 지원 상태를 반환합니다."""
-    # print(study)
     try:
         # 확정 참여자인 경우
         if user_id in study.get("confirmed_candidate", []):
@@ -301,9 +900,6 @@ def get_application_status(study, user_id):
 
         # 지원했지만 아직 대기중인 경우
         for candidate in study.get("candidate", []):
-            print(candidate.get("user_id", []))
-            print(user_id)
-            print(user_id in candidate.get("user_id", []))
             if user_id in candidate.get("user_id", []):
                 return "pending"  # 대기중
 
@@ -0,0 +1,93 @@
+import re
+import unicodedata
+
+from pymongo import UpdateOne
+from db import get_db
+
+# 한글/영문/숫자 단위로 자른 단어
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+REINDEX_BATCH_SIZE = 500
+
+
+def _words(text):
+    text = unicodedata.normalize("NFKC", text or "").lower()
+    return _WORD_RE.findall(text)
+
+
+def _bigrams(word):
+    return [word[i:i + 2] for i in range(len(word) - 1)]
+
+
+def tokenize_document(text):
+    """문서 텍스트를 1-gram + 2-gram 토큰 집합으로 만듭니다.
+
+    한국어는 띄어쓰기/조사 때문에 단어 단위 검색이 잘 맞지 않으므로
+    n-gram으로 부분 문자열 검색을 흉내낸다. ('머신러닝' -> 머,신,러,닝,머신,신러,러닝)
+    """
+    tokens = set()
+    for word in _words(text):
+        tokens.update(word)
+        tokens.update(_bigrams(word))
+    return tokens
+
+
+def tokenize_query(keyword):
+    """검색어를 토큰 목록으로 만듭니다. (한 글자 단어는 1-gram, 나머지는 2-gram)"""
+    tokens = []
+    for word in _words(keyword):
+        for token in (_bigrams(word) if len(word) > 1 else [word]):
+            if token not in tokens:
+                tokens.append(token)
+    return tokens
+
+
+def build_search_fields(name, description):
+    """스터디 문서에 저장할 검색용 필드를 만듭니다."""
+    name_tokens = tokenize_document(name)
+    return {
+        "name_tokens": sorted(name_tokens),
+        "search_tokens": sorted(name_tokens | tokenize_document(description)),
+    }
+
+
+def build_search_query(keyword):
+    """검색어가 모든 토큰을 포함하는 스터디만 고르는 조건 (토큰이 없으면 None)"""
+    tokens = tokenize_query(keyword)
+    if not tokens:
+        return None, []
+    return {"search_tokens": {"$all": tokens}}, tokens
+
+
+def search_score_expr(tokens):
+    """이름에 검색 토큰이 많이 들어 있을수록 높은 점수"""
+    return {
+        "$size": {
+            "$setIntersection": [tokens, {"$ifNull": ["$name_tokens", []]}]
+        }
+    }
+
+
+def reindex_studies(only_missing=False, db=None):
+    """스터디 검색 토큰을 다시 계산합니다. (only_missing이면 토큰 없는 문서만)"""
+    db = db if db is not None else get_db()
+    query = {"search_tokens": {"$exists": False}} if only_missing else {}
+
+    updated = 0
+    batch = []
+    cursor = db.study.find(query, {"_id": 1, "name": 1, "description": 1})
+    for study in cursor:
+        batch.append(UpdateOne(
+            {"_id": study["_id"]},
+            {"$set": build_search_fields(
+                study.get("name", ""), study.get("description", "")
+            )},
+        ))
+        if len(batch) >= REINDEX_BATCH_SIZE:
+            updated += db.study.bulk_write(batch, ordered=False).modified_count
+            batch = []
+
+    if batch:
+        updated += db.study.bulk_write(batch, ordered=False).modified_count
+
+    return updated
@@ -0,0 +1,84 @@
+from pymongo import UpdateOne
+from db import get_db
+
+# 사용자별 지원(확정 포함)한 스터디 _id 목록
+# {_id: 사용자 ID, study_ids: [스터디 _id, ...], confirmed_ids: [확정된 스터디 _id, ...]}
+USER_STUDY_COLLECTION = "user_study"
+
+
+def get_user_study_ids(user_id):
+    """사용자가 지원했거나 확정된 스터디의 _id 목록을 반환합니다."""
+    doc = get_db()[USER_STUDY_COLLECTION].find_one(
+        {"_id": user_id}, {"study_ids": 1}
+    )
+    return doc.get("study_ids", []) if doc else []
+
+
+def get_user_study_sets(user_id):
+    """(지원한 스터디 _id 집합, 확정된 스터디 _id 집합) 을 반환합니다."""
+    doc = get_db()[USER_STUDY_COLLECTION].find_one({"_id": user_id}) or {}
+    return (
+        frozenset(doc.get("study_ids", [])),
+        frozenset(doc.get("confirmed_ids", [])),
+    )
+
+
+def add_user_study(user_ids, study_oid, confirmed=False):
+    """사용자들의 지원 스터디 목록에 스터디를 추가합니다. (confirmed면 확정 목록에도)"""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    add = {"study_ids": study_oid}
+    if confirmed:
+        add["confirmed_ids"] = study_oid
+    try:
+        get_db()[USER_STUDY_COLLECTION].bulk_write([
+            UpdateOne(
+                {"_id": user_id},
+                {"$addToSet": add},
+                upsert=True,
+            )
+            for user_id in user_ids
+        ], ordered=False)
+    except Exception as e:
+        # 스터디 쓰기는 이미 끝났으므로 실패는 기록만 하고 rebuild로 복구
+        print(f"지원 스터디 목록 추가 오류: {e}")
+
+
+def remove_user_study(user_ids, study_oid):
+    """사용자들의 지원 스터디 목록에서 스터디를 제거합니다."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    try:
+        get_db()[USER_STUDY_COLLECTION].update_many(
+            {"_id": {"$in": user_ids}},
+            {"$pull": {"study_ids": study_oid, "confirmed_ids": study_oid}},
+        )
+    except Exception as e:
+        print(f"지원 스터디 목록 제거 오류: {e}")
+
+
+def remove_studies_from_all(study_oids):
+    """삭제된 스터디들을 모든 사용자의 목록에서 제거합니다."""
+    study_oids = list(study_oids)
+    if not study_oids:
+        return
+    try:
+        get_db()[USER_STUDY_COLLECTION].update_many(
+            {"study_ids": {"$in": study_oids}},
+            {"$pull": {
+                "study_ids": {"$in": study_oids},
+                "confirmed_ids": {"$in": study_oids},
+            }},
+        )
+    except Exception as e:
+        print(f"지원 스터디 목록 제거 오류: {e}")
+
+
+def delete_user_studies(user_id):
+    """탈퇴한 사용자의 목록을 삭제합니다."""
+    try:
+        get_db()[USER_STUDY_COLLECTION].delete_one({"_id": user_id})
+    except Exception as e:
+        print(f"지원 스터디 목록 삭제 오류: {e}")
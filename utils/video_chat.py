@@ -2,6 +2,7 @@ from db import get_db
 from bson import ObjectId
 from datetime import datetime, timezone
 from utils.send_mail import send_study_confirmation_email
+from utils.notification import increment_unread_count, push_notification
 import uuid
 
 def create_study_confirmation_notification(confirmed_candidates, study_name, study_date, host_id=None):
@@ -26,6 +27,8 @@ def create_study_confirmation_notification(confirmed_candidates, study_name, stu
         # 트랜잭션을 위한 성공/실패 추적
         successful_operations = []
         failed_operations = []
+        # 모든 저장이 끝난 뒤에 읽지 않은 개수를 올리고 보낼 알림
+        pending_pushes = []
         
         try:
             # 1. video_chat 컬렉션에 방 정보 저장
@@ -62,6 +65,7 @@ def create_study_confirmation_notification(confirmed_candidates, study_name, stu
                         raise Exception(f"사용자 {user_id} 알림 생성 실패")
                     
                     successful_operations.append(('notification', notify_result.inserted_id))
+                    pending_pushes.append((user_id, notification))
                     
                     # 사용자 정보 조회
                     user = db.user.find_one({"id": user_id})
@@ -117,6 +121,7 @@ def create_study_confirmation_notification(confirmed_candidates, study_name, stu
                         raise Exception(f"호스트 {host_id} 알림 생성 실패")
                     
                     successful_operations.append(('host_notification', host_notify_result.inserted_id))
+                    pending_pushes.append((host_id, host_notification))
                     
                     # 호스트 정보 조회
                     host_user = db.user.find_one({"id": host_id})
@@ -149,6 +154,14 @@ def create_study_confirmation_notification(confirmed_candidates, study_name, stu
                     print(f"호스트 {host_id} 처리 오류: {host_error}")
                     failed_operations.append(('host_process', host_id))
             
+            # 4. 롤백될 수 있는 작업이 모두 끝난 뒤에 읽지 않은 알림 개수 갱신 및 푸시
+            #    (중간에 오류로 알림이 삭제되면 개수가 어긋나지 않도록)
+            for target_id, pending in pending_pushes:
+                push_notification(
+                    target_id, pending,
+                    increment_unread_count(target_id, 1)
+                )
+
             # 결과 확인
             if failed_operations:
                 print(f"일부 작업 실패: {failed_operations}")